@@ -12,10 +12,16 @@ def create_test_kobo_database():
     if os.path.exists('KoboReader.sqlite'):
         os.remove('KoboReader.sqlite')
     
-    # Create new database
-    conn = sqlite3.connect('KoboReader.sqlite')
+    # Create new database; autocommit mode so the whole build runs in one explicit transaction
+    conn = sqlite3.connect('KoboReader.sqlite', isolation_level=None)
     cursor = conn.cursor()
     
+    # Bulk-load settings: durability doesn't matter since the file is rebuilt on every run
+    for pragma in ("journal_mode=OFF", "synchronous=OFF", "temp_store=MEMORY", "locking_mode=EXCLUSIVE"):
+        cursor.execute(f"PRAGMA {pragma}")
+    
+    cursor.execute("BEGIN")
+    
     # Create content table
     cursor.execute('''
         CREATE TABLE content(
@@ -117,11 +123,10 @@ def create_test_kobo_database():
         ('little-id', 'little', 'little', 'UserTag', False, True),
     ]
     
-    for shelf_id, name, internal_name, shelf_type, is_deleted, is_visible in collections:
-        cursor.execute('''
-            INSERT INTO Shelf (Id, Name, InternalName, Type, _IsDeleted, _IsVisible, CreationDate, LastModified)
-            VALUES (?, ?, ?, ?, ?, ?, '2024-01-01T00:00:00.000', '2024-01-01T00:00:00.000')
-        ''', (shelf_id, name, internal_name, shelf_type, is_deleted, is_visible))
+    cursor.executemany('''
+        INSERT INTO Shelf (Id, Name, InternalName, Type, _IsDeleted, _IsVisible, CreationDate, LastModified)
+        VALUES (?, ?, ?, ?, ?, ?, '2024-01-01T00:00:00.000', '2024-01-01T00:00:00.000')
+    ''', collections)
     
     # Insert sample books
     books = [
@@ -132,13 +137,14 @@ def create_test_kobo_database():
         ('book5', '6', 'application/epub+zip', 'book5', 'The Desert Here and the Desert Far Away', 'The Desert Here and the Desert Far Away', '7iris', 0, 0, None),
     ]
     
-    for content_id, content_type, mime_type, book_id, title, book_title, author, read_status, percent_read, date_last_read in books:
-        cursor.execute('''
-            INSERT INTO content (
-                ContentID, ContentType, MimeType, BookID, Title, BookTitle, Attribution,
-                ReadStatus, ___PercentRead, DateLastRead, ___UserID
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'test-user')
-        ''', (content_id, content_type, mime_type, book_id, title, book_title, author, read_status, percent_read, date_last_read))
+    # Tuples are (ContentID, ContentType, MimeType, BookID, Title, BookTitle, Attribution,
+    #             ReadStatus, ___PercentRead, DateLastRead) to match the INSERT below
+    cursor.executemany('''
+        INSERT INTO content (
+            ContentID, ContentType, MimeType, BookID, Title, BookTitle, Attribution,
+            ReadStatus, ___PercentRead, DateLastRead, ___UserID
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'test-user')
+    ''', books)
     
     # Insert shelf content relationships
     shelf_contents = [
@@ -165,13 +171,12 @@ def create_test_kobo_database():
         ('sweet fluff', 'book5'),
     ]
     
-    for shelf_name, content_id in shelf_contents:
-        cursor.execute('''
-            INSERT INTO ShelfContent (ShelfName, ContentId, DateModified, _IsDeleted, _IsSynced)
-            VALUES (?, ?, '2024-01-01T00:00:00.000', 0, 1)
-        ''', (shelf_name, content_id))
+    cursor.executemany('''
+        INSERT INTO ShelfContent (ShelfName, ContentId, DateModified, _IsDeleted, _IsSynced)
+        VALUES (?, ?, '2024-01-01T00:00:00.000', 0, 1)
+    ''', shelf_contents)
     
-    # Commit and close
+    # Commit the single transaction and close
     conn.commit()
     conn.close()
     
@@ -4,9 +4,16 @@ Main entry point for the multi-library sync application.
 """
 
 import sys
+import queue
 import logging
+import logging.handlers
 from pathlib import Path
 
+# The data classes use dataclass(slots=True); fail with a clear message
+# rather than a TypeError on import
+if sys.version_info < (3, 10):
+    sys.exit("Kobo-to-Calibre Sync Tool requires Python 3.10 or newer")
+
 # Add src directory to path for imports
 sys.path.append(str(Path(__file__).parent / "src"))
 
@@ -17,14 +24,25 @@ from sync_engine import SyncEngine
 
 def main():
     """Main entry point for the Kobo-to-Calibre sync tool."""
-    # Set up logging
+    # Set up logging; records are queued and written by a background
+    # listener thread so file and console I/O never block the caller
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    output_handlers = [
+        logging.FileHandler('logs/kobo_sync.log'),
+        logging.StreamHandler()
+    ]
+    for handler in output_handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *output_handlers)
+    listener.start()
+    
+    # The queue handler only merges message arguments; the listener's handlers add the rest
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('logs/kobo_sync.log'),
-            logging.StreamHandler()
-        ]
+        format='%(message)s',
+        handlers=[logging.handlers.QueueHandler(log_queue)]
     )
     
     logger = logging.getLogger(__name__)
@@ -41,6 +59,10 @@ def main():
     except Exception as e:
         logger.error(f"Application error: {e}")
         raise
+    
+    finally:
+        # Flush any queued records before exiting
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -2,10 +2,16 @@
 Book Matcher - Cross-library book matching logic
 """
 
+import os
 import sqlite3
 import logging
+import json
 import re
-from typing import List, Optional, Dict, Tuple
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import List, Optional, Dict, Tuple, Set, Iterator, Any
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -14,7 +20,74 @@ from kobo_reader import KoboBook
 from library_manager import CalibreLibrary
 
 
-@dataclass
+# Sidecar databases holding each library's persistent match index
+_MATCH_INDEX_DIR = Path("cache")
+# Bumped whenever the index contents change, so existing sidecars are rebuilt
+_MATCH_INDEX_VERSION = 2
+
+# Calibre books and their author links, fetched separately and joined in Python
+_CALIBRE_BOOKS_SQL = "SELECT id, title FROM {schema}.books"
+_CALIBRE_AUTHORS_SQL = """
+    SELECT ba.book, a.name
+    FROM {schema}.books_authors_link ba
+    JOIN {schema}.authors a ON ba.author = a.id
+    ORDER BY ba.book, ba.id  -- link order, the author order Calibre displays
+"""
+
+# Books matched between progress events
+_PROGRESS_BATCH_SIZE = 10
+
+# Normalization patterns, compiled once for the matching hot path
+_NON_WORD = re.compile(r'[^\w\s]')
+_WS = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=8192)
+def _norm_title(title: str) -> str:
+    """Normalize title for matching (cached, titles repeat across libraries)."""
+    if not title:
+        return ""
+    
+    # Lowercase, then remove common punctuation and extra spaces
+    normalized = _WS.sub(' ', _NON_WORD.sub(' ', title.lower()))
+    
+    # Remove common articles at the beginning
+    if normalized.startswith(('the ', 'a ', 'an ')):
+        normalized = normalized[normalized.index(' ') + 1:]
+    
+    return normalized.strip()
+
+
+@lru_cache(maxsize=8192)
+def _norm_author(author: str) -> str:
+    """Normalize author name for matching (cached, many books share an author)."""
+    if not author:
+        return ""
+    
+    # Convert to lowercase and remove extra spaces
+    normalized = _WS.sub(' ', author.lower().strip())
+    
+    # Handle "Last, First" vs "First Last" format
+    if ',' in normalized:
+        parts = [part.strip() for part in normalized.split(',')]
+        if len(parts) == 2:
+            # Convert "Last, First" to "First Last"
+            normalized = f"{parts[1]} {parts[0]}"
+    
+    return normalized
+
+
+class _LazyLibraryNames:
+    """Formats the library names of a list of matches only when a log record is emitted."""
+    
+    def __init__(self, matches):
+        self.matches = matches
+    
+    def __str__(self) -> str:
+        return str([match.library.name for match in self.matches])
+
+
+@dataclass(slots=True)
 class BookMatch:
     """Represents a potential match between Kobo and Calibre book."""
     kobo_book: KoboBook
@@ -26,7 +99,7 @@ class BookMatch:
     match_type: str  # 'exact', 'normalized', 'fuzzy'
 
 
-@dataclass
+@dataclass(slots=True)
 class BookConflict:
     """Represents a book found in multiple libraries."""
     kobo_book: KoboBook
@@ -44,52 +117,36 @@ class BookMatcher:
         self.logger = logging.getLogger(__name__)
         self.unmatched_books = []
         self.conflicts = []
+        
+        # Per-library lookup index: library name -> normalized title -> candidate books
+        self._library_index: Dict[str, Dict[str, List[Tuple[int, str, str, str]]]] = {}
+        # Normalized Kobo titles for the current matching run (None outside match_all_books)
+        self._kobo_titles: Optional[Set[str]] = None
+        # Title set the cached library indexes are restricted to, and the
+        # (metadata.db path, mtime, size) each index was built from; indexes
+        # are kept between runs while both still hold
+        self._indexed_titles: Optional[Set[str]] = None
+        self._index_sources: Dict[str, Tuple[str, int, int]] = {}
+        # Used to load several library indexes at once; lookups after that are dict hits
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Open connection per Calibre library (keyed like the index), kept until close()
+        self._conns: Dict[str, sqlite3.Connection] = {}
+        # Open connection per library's persistent match index sidecar
+        self._index_conns: Dict[str, sqlite3.Connection] = {}
     
     def normalize_title(self, title: str) -> str:
         """Normalize title for matching."""
-        if not title:
-            return ""
-        
-        # Convert to lowercase
-        normalized = title.lower()
-        
-        # Remove common punctuation and extra spaces
-        normalized = re.sub(r'[^\w\s]', ' ', normalized)
-        normalized = re.sub(r'\s+', ' ', normalized)
-        
-        # Remove common articles at the beginning
-        articles = ['the ', 'a ', 'an ']
-        for article in articles:
-            if normalized.startswith(article):
-                normalized = normalized[len(article):]
-                break
-        
-        return normalized.strip()
+        return _norm_title(title)
     
     def normalize_author(self, author: str) -> str:
         """Normalize author name for matching."""
-        if not author:
-            return ""
-        
-        # Convert to lowercase and remove extra spaces
-        normalized = re.sub(r'\s+', ' ', author.lower().strip())
-        
-        # Handle "Last, First" vs "First Last" format
-        if ',' in normalized:
-            parts = [part.strip() for part in normalized.split(',')]
-            if len(parts) == 2:
-                # Convert "Last, First" to "First Last"
-                normalized = f"{parts[1]} {parts[0]}"
-        
-        return normalized
+        return _norm_author(author)
     
-    def _check_author_match(self, kobo_author_norm: str, calibre_authors_str: str) -> Optional[Dict]:
-        """Check if Kobo author matches Calibre authors (handling multiple authors)."""
-        if not kobo_author_norm or not calibre_authors_str:
+    def _check_author_match(self, kobo_author_norm: str, calibre_author_norm: str) -> Optional[Dict]:
+        """Check if Kobo author matches normalized Calibre authors (handling multiple authors)."""
+        if not kobo_author_norm or not calibre_author_norm:
             return None
         
-        calibre_author_norm = self.normalize_author(calibre_authors_str)
-        
         # Exact match
         if kobo_author_norm == calibre_author_norm:
             return {'type': 'exact', 'confidence': 1.0}
@@ -111,90 +168,377 @@ class BookMatcher:
         
         return None
     
-    def find_book_in_library(self, kobo_book: KoboBook, library: CalibreLibrary) -> Optional[BookMatch]:
-        """Find a book in a specific Calibre library."""
-        try:
-            conn = sqlite3.connect(library.metadata_db_path)
+    def _conn_for(self, library: CalibreLibrary) -> sqlite3.Connection:
+        """Get the cached connection to a library's metadata.db, opening it on first use."""
+        conn = self._conns.get(library.name)
+        if conn is None:
+            # Index builds may run on pool threads; each library's connection is only used by one at a time
+            conn = sqlite3.connect(library.metadata_db_path, check_same_thread=False)
             conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
             
-            # Get all books with authors
-            cursor.execute("""
-                SELECT 
-                    b.id,
-                    b.title,
-                    GROUP_CONCAT(a.name, ' & ') as authors
-                FROM books b
-                LEFT JOIN books_authors_link ba ON b.id = ba.book
-                LEFT JOIN authors a ON ba.author = a.id
-                GROUP BY b.id, b.title
-            """)
+            # Read-tuned settings: keep metadata.db hot in memory, and never write to the user's library
+            for pragma in ("cache_size=-65536", "mmap_size=268435456", "query_only=1", "temp_store=MEMORY"):
+                conn.execute(f"PRAGMA {pragma}")
+            self._conns[library.name] = conn
+        return conn
+    
+    def _fetch_calibre_books(self, conn: sqlite3.Connection, schema: str = "main") -> List[Tuple[int, str, str]]:
+        """Fetch (id, title, authors) for every book, with multiple authors joined as "A & B"."""
+        authors_by_book: Dict[int, List[str]] = {}
+        for book_id, name in conn.execute(_CALIBRE_AUTHORS_SQL.format(schema=schema)):
+            authors_by_book.setdefault(book_id, []).append(name)
+        
+        return [
+            (book_id, title, ' & '.join(authors_by_book.get(book_id, ())))
+            for book_id, title in conn.execute(_CALIBRE_BOOKS_SQL.format(schema=schema))
+        ]
+    
+    def _match_index_path(self, library: CalibreLibrary) -> Path:
+        """Sidecar file for a library's match index, unique per metadata.db location."""
+        digest = hashlib.sha1(str(library.metadata_db_path.resolve()).encode('utf-8')).hexdigest()[:12]
+        safe_name = re.sub(r'[^\w-]', '_', library.name)
+        return _MATCH_INDEX_DIR / f"{safe_name}_{digest}.db"
+    
+    def _refresh_match_index(self, conn: sqlite3.Connection, library: CalibreLibrary, source_key: str) -> None:
+        """Rebuild the kobo_match_idx table from the library's current books."""
+        self.logger.info("Building match index for %s", library.name)
+        
+        # Attached read-only, so the rebuild can never write to the user's library
+        library_uri = f"{library.metadata_db_path.resolve().as_uri()}?mode=ro"
+        conn.execute("ATTACH DATABASE ? AS lib", (library_uri,))
+        
+        try:
+            with conn:
+                # Clear the source key first so an interrupted rebuild is redone next run
+                conn.execute("DELETE FROM index_info")
+                conn.execute("DROP TABLE IF EXISTS kobo_match_idx")
+                conn.execute("""
+                    CREATE TABLE kobo_match_idx (
+                        book_id INTEGER,
+                        title TEXT,
+                        authors TEXT,
+                        norm_title TEXT,
+                        norm_author TEXT
+                    )
+                """)
+                conn.executemany(
+                    "INSERT INTO kobo_match_idx VALUES (?, ?, ?, ?, ?)",
+                    ((book_id, title, authors, _norm_title(title), _norm_author(authors))
+                     for book_id, title, authors in self._fetch_calibre_books(conn, "lib"))
+                )
+                conn.execute("CREATE INDEX idx_kmi ON kobo_match_idx(norm_title, norm_author)")
+                conn.execute("INSERT INTO index_info VALUES (?)", (source_key,))
+        finally:
+            conn.execute("DETACH DATABASE lib")
+    
+    def _match_index_conn(self, library: CalibreLibrary) -> Optional[sqlite3.Connection]:
+        """
+        Get the connection to a library's persistent match index, rebuilding it if metadata.db changed.
+        
+        Returns None if the sidecar can't be created or read, in which case
+        the library is scanned directly instead.
+        """
+        conn = self._index_conns.get(library.name)
+        
+        try:
+            if conn is None:
+                _MATCH_INDEX_DIR.mkdir(exist_ok=True)
+                index_uri = self._match_index_path(library).resolve().as_uri()
+                conn = sqlite3.connect(index_uri, uri=True, check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute("CREATE TABLE IF NOT EXISTS index_info (source_key TEXT)")
+                self._index_conns[library.name] = conn
             
-            calibre_books = cursor.fetchall()
-            conn.close()
+            # Rebuild whenever Calibre has modified the library since the last build
+            stat = library.metadata_db_path.stat()
+            source_key = f"{_MATCH_INDEX_VERSION}:{stat.st_mtime_ns}:{stat.st_size}"
+            row = conn.execute("SELECT source_key FROM index_info").fetchone()
+            if row is None or row['source_key'] != source_key:
+                self._refresh_match_index(conn, library, source_key)
             
-            # Try exact match first
-            kobo_title_norm = self.normalize_title(kobo_book.title)
-            kobo_author_norm = self.normalize_author(kobo_book.author)
+            return conn
             
-            for book in calibre_books:
-                calibre_title_norm = self.normalize_title(book['title'])
-                calibre_authors_str = book['authors'] or ""
-                
-                # Title must match exactly
-                if kobo_title_norm != calibre_title_norm:
-                    continue
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning("Match index unavailable for %s, scanning library directly: %s", library.name, e)
+            if conn is not None:
+                conn.close()
+                self._index_conns.pop(library.name, None)
+            return None
+    
+    def close(self) -> None:
+        """Close cached library connections and stop the index worker pool."""
+        for conn in self._conns.values():
+            conn.close()
+        self._conns = {}
+        
+        for conn in self._index_conns.values():
+            conn.close()
+        self._index_conns = {}
+        
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+    
+    def _build_library_index(self, library: CalibreLibrary) -> Dict[str, List[Tuple[int, str, str, str]]]:
+        """
+        Load a library's books once and index them by normalized title.
+        
+        Books are read from the library's persistent match index, which already
+        holds normalized keys; if that is unavailable the library is read directly.
+        During a matching run only Calibre books that share a title with some
+        Kobo book are kept; the match index does this inside SQLite, with the
+        Kobo titles passed in as a JSON array.
+        """
+        index = {}
+        
+        try:
+            stat = library.metadata_db_path.stat()
+            source = (str(library.metadata_db_path), stat.st_mtime_ns, stat.st_size)
+            conn = self._match_index_conn(library)
+            
+            if conn is not None:
+                query = "SELECT book_id, title, authors, norm_title, norm_author FROM kobo_match_idx"
+                params = ()
                 
-                # Check author matching - handle multiple authors
-                author_match = self._check_author_match(kobo_author_norm, calibre_authors_str)
+                if self._kobo_titles is not None:
+                    query += " WHERE norm_title IN (SELECT value FROM json_each(?))"
+                    params = (json.dumps(list(self._kobo_titles)),)
                 
-                if author_match:
-                    match_type = author_match['type']
-                    confidence = author_match['confidence']
-                    
-                    self.logger.debug(
-                        f"✅ Found {match_type} match: '{kobo_book.title}' "
-                        f"(Kobo: '{kobo_book.author}' → Calibre: '{calibre_authors_str}')"
-                    )
-                    
-                    return BookMatch(
-                        kobo_book=kobo_book,
-                        calibre_book_id=book['id'],
-                        calibre_title=book['title'],
-                        calibre_authors=calibre_authors_str,
-                        library=library,
-                        match_confidence=confidence,
-                        match_type=match_type
-                    )
+                calibre_books = [tuple(row) for row in conn.execute(query, params)]
+            else:
+                calibre_books = [
+                    (book_id, title, authors, self.normalize_title(title), None)
+                    for book_id, title, authors in self._fetch_calibre_books(self._conn_for(library))
+                ]
+                if self._kobo_titles is not None:
+                    calibre_books = [book for book in calibre_books if book[3] in self._kobo_titles]
             
-            # If no exact match found, return None (strict matching only)
-            return None
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error("Error searching library %s: %s", library.name, e)
+            return index
+        
+        for book_id, calibre_title, calibre_authors_str, title_norm, calibre_author_norm in calibre_books:
+            calibre_authors_str = calibre_authors_str or ""
+            if calibre_author_norm is None:
+                calibre_author_norm = self.normalize_author(calibre_authors_str)
+            entry = (
+                book_id,
+                calibre_title,
+                calibre_authors_str,
+                calibre_author_norm
+            )
+            index.setdefault(title_norm, []).append(entry)
+        
+        # Only successfully built indexes are eligible for reuse by later runs
+        self._index_sources[library.name] = source
+        
+        self.logger.debug("Indexed %d books from %s", len(calibre_books), library.name)
+        return index
+    
+    def _reset_library_indexes(self, kobo_titles: Optional[Set[str]]) -> None:
+        """Drop all cached library indexes and restrict new ones to kobo_titles."""
+        self._library_index = {}
+        self._index_sources = {}
+        self._indexed_titles = kobo_titles
+    
+    def _drop_stale_indexes(self, libraries: List[CalibreLibrary]) -> None:
+        """Drop cached indexes whose library moved, changed on disk or failed to load."""
+        current = {library.name: library for library in libraries}
+        
+        for name in list(self._library_index):
+            source = self._index_sources.get(name)
+            library = current.get(name)
+            if source is not None and library is not None:
+                path, mtime_ns, size = source
+                try:
+                    stat = os.stat(path)
+                    if path == str(library.metadata_db_path) and (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+                        continue
+                except OSError:
+                    pass
             
-        except sqlite3.Error as e:
-            self.logger.error(f"Error searching library {library.name}: {e}")
-            return None
+            del self._library_index[name]
+            self._index_sources.pop(name, None)
+    
+    def _get_library_index(self, library: CalibreLibrary) -> Dict[str, List[Tuple[int, str, str, str]]]:
+        """Get the lookup index for a library, building it on first use."""
+        if self._kobo_titles is not self._indexed_titles:
+            # Cached indexes were restricted to another run's titles
+            self._reset_library_indexes(self._kobo_titles)
+        
+        index = self._library_index.get(library.name)
+        if index is None:
+            index = self._build_library_index(library)
+            self._library_index[library.name] = index
+        return index
+    
+    def _prebuild_library_indexes(self, libraries: List[CalibreLibrary]) -> None:
+        """Build any missing library indexes in parallel."""
+        if self._kobo_titles is not self._indexed_titles:
+            self._reset_library_indexes(self._kobo_titles)
+        
+        missing = [lib for lib in libraries if lib.name not in self._library_index]
+        if len(missing) < 2:
+            # Nothing to overlap; _get_library_index builds it inline
+            return
+        
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="library-index")
+        
+        for library, index in zip(missing, self._pool.map(self._build_library_index, missing)):
+            self._library_index[library.name] = index
     
-    def find_book_across_libraries(self, kobo_book: KoboBook) -> List[BookMatch]:
-        """Find a book across all libraries, prioritizing primary library."""
+    def find_book_in_library(self, kobo_book: KoboBook, library: CalibreLibrary,
+                             kobo_keys: Optional[Tuple[str, str]] = None) -> Optional[BookMatch]:
+        """
+        Find a book in a specific Calibre library.
+        
+        Args:
+            kobo_keys: Pre-normalized (title, author) for the Kobo book, if already computed.
+        """
+        if kobo_keys is None:
+            kobo_keys = (self.normalize_title(kobo_book.title), self.normalize_author(kobo_book.author))
+        kobo_title_norm, kobo_author_norm = kobo_keys
+        
+        # Title must match exactly, so only books sharing the normalized title are candidates
+        candidates = self._get_library_index(library).get(kobo_title_norm, [])
+        
+        for book_id, calibre_title, calibre_authors_str, calibre_author_norm in candidates:
+            # Check author matching - handle multiple authors
+            author_match = self._check_author_match(kobo_author_norm, calibre_author_norm)
+            
+            if author_match:
+                match_type = author_match['type']
+                confidence = author_match['confidence']
+                
+                self.logger.debug(
+                    "✅ Found %s match: '%s' (Kobo: '%s' → Calibre: '%s')",
+                    match_type, kobo_book.title, kobo_book.author, calibre_authors_str
+                )
+                
+                return BookMatch(
+                    kobo_book=kobo_book,
+                    calibre_book_id=book_id,
+                    calibre_title=calibre_title,
+                    calibre_authors=calibre_authors_str,
+                    library=library,
+                    match_confidence=confidence,
+                    match_type=match_type
+                )
+        
+        # If no exact match found, return None (strict matching only)
+        return None
+    
+    def find_book_across_libraries(self, kobo_book: KoboBook,
+                                   primary_library: Optional[CalibreLibrary] = None,
+                                   secondary_libraries: Optional[Tuple[CalibreLibrary, ...]] = None,
+                                   kobo_keys: Optional[Tuple[str, str]] = None) -> List[BookMatch]:
+        """
+        Find a book across all libraries, prioritizing primary library.
+        
+        Args:
+            primary_library, secondary_libraries: Libraries already resolved for this run;
+                looked up from the library manager when not given.
+            kobo_keys: Pre-normalized (title, author) for the Kobo book, if already computed.
+        """
         matches = []
         
+        # Normalize the Kobo side once rather than once per library
+        if kobo_keys is None:
+            kobo_keys = (self.normalize_title(kobo_book.title), self.normalize_author(kobo_book.author))
+        
+        # Books missing a title or author can never satisfy strict matching
+        if not all(kobo_keys):
+            return matches
+        
+        if secondary_libraries is None:
+            primary_library = self.library_manager.get_primary_library()
+            secondary_libraries = tuple(self.library_manager.get_secondary_libraries())
+        
         # Search primary library (MCR) first
-        primary_library = self.library_manager.get_primary_library()
         if primary_library:
-            match = self.find_book_in_library(kobo_book, primary_library)
+            match = self.find_book_in_library(kobo_book, primary_library, kobo_keys)
             if match:
                 matches.append(match)
                 # For strict matching, return immediately if found in primary
                 return matches
+            
+            # Strict primary-only runs never fall back to the secondary libraries
+            if self.library_manager.strict_primary_only:
+                return matches
+        
+        # Search secondary libraries, loading any not yet indexed concurrently
+        self._prebuild_library_indexes(secondary_libraries)
         
-        # Search secondary libraries
-        for library in self.library_manager.get_secondary_libraries():
-            match = self.find_book_in_library(kobo_book, library)
+        for library in secondary_libraries:
+            match = self.find_book_in_library(kobo_book, library, kobo_keys)
             if match:
                 matches.append(match)
         
         return matches
     
+    def iter_matches(self, kobo_books: List[KoboBook]) -> Iterator[Tuple[str, Any]]:
+        """
+        Match Kobo books against Calibre libraries, yielding results as they are found.
+        
+        Yields (event, payload) tuples:
+            ('progress', (start, end)) before each batch of books kobo_books[start:end] is matched
+            ('match', BookMatch)       book found in exactly one library
+            ('conflict', BookConflict) book found in multiple libraries
+            ('unmatched', KoboBook)    book not found in any library
+        """
+        # Normalize every Kobo book once up front; library indexes are
+        # restricted to titles that appear on the Kobo
+        kobo_keys = [(self.normalize_title(book.title), self.normalize_author(book.author)) for book in kobo_books]
+        kobo_titles = {title for title, _ in kobo_keys}
+        
+        # Resolve the libraries once for the whole run
+        primary_library = self.library_manager.get_primary_library()
+        secondary_libraries = tuple(self.library_manager.get_secondary_libraries())
+        
+        if kobo_titles == self._indexed_titles:
+            # Same Kobo titles as the last run: reuse the indexes of libraries
+            # Calibre hasn't modified since, so each run sees current data
+            self._kobo_titles = self._indexed_titles
+            self._drop_stale_indexes(self.library_manager.get_all_libraries())
+        else:
+            self._kobo_titles = kobo_titles
+            self._reset_library_indexes(kobo_titles)
+        
+        books = iter(zip(kobo_books, kobo_keys))
+        start = 0
+        
+        try:
+            while True:
+                batch = list(islice(books, _PROGRESS_BATCH_SIZE))
+                if not batch:
+                    break
+                
+                yield 'progress', (start, start + len(batch))
+                start += len(batch)
+                
+                for kobo_book, keys in batch:
+                    matches = self.find_book_across_libraries(kobo_book, primary_library, secondary_libraries, keys)
+                    
+                    if not matches:
+                        self.logger.debug("No match found for '%s' by %s", kobo_book.title, kobo_book.author)
+                        yield 'unmatched', kobo_book
+                    elif len(matches) == 1:
+                        # Single match
+                        yield 'match', matches[0]
+                    else:
+                        # Multiple matches - this is a conflict
+                        self.logger.warning(
+                            "CONFLICT: '%s' by %s found in %d libraries: %s",
+                            kobo_book.title, kobo_book.author, len(matches),
+                            _LazyLibraryNames(matches)
+                        )
+                        yield 'conflict', BookConflict(kobo_book=kobo_book, matches=matches)
+        finally:
+            # The restricted indexes stay cached for a rerun over the same books,
+            # but lookups outside a run need unrestricted ones
+            self._kobo_titles = None
+    
     def match_all_books(self, kobo_books: List[KoboBook]) -> Tuple[List[BookMatch], List[KoboBook], List[BookConflict]]:
         """
         Match all Kobo books against Calibre libraries.
@@ -202,39 +546,25 @@ class BookMatcher:
         Returns:
             Tuple of (successful_matches, unmatched_books, conflicts)
         """
-        successful_matches = []
-        unmatched_books = []
-        conflicts = []
+        results = {'match': [], 'unmatched': [], 'conflict': []}
         
-        self.logger.info(f"Starting to match {len(kobo_books)} books")
+        self.logger.info("Starting to match %d books", len(kobo_books))
         
-        for i, kobo_book in enumerate(kobo_books):
-            if i % 10 == 0:
-                self.logger.info(f"Processing book {i+1}/{len(kobo_books)}: {kobo_book.title}")
-            
-            matches = self.find_book_across_libraries(kobo_book)
-            
-            if matches:
-                if len(matches) == 1:
-                    # Single match - add to successful matches
-                    successful_matches.append(matches[0])
-                else:
-                    # Multiple matches - this is a conflict
-                    conflict = BookConflict(
-                        kobo_book=kobo_book,
-                        matches=matches
-                    )
-                    conflicts.append(conflict)
-                    
-                    self.logger.warning(
-                        f"CONFLICT: '{kobo_book.title}' by {kobo_book.author} found in {len(matches)} libraries: "
-                        f"{[match.library.name for match in matches]}"
-                    )
+        for event, payload in self.iter_matches(kobo_books):
+            if event == 'progress':
+                start, end = payload
+                self.logger.info("Processing books %d-%d/%d", start + 1, end, len(kobo_books))
             else:
-                unmatched_books.append(kobo_book)
-                self.logger.debug(f"No match found for '{kobo_book.title}' by {kobo_book.author}")
+                results[event].append(payload)
+        
+        successful_matches = results['match']
+        unmatched_books = results['unmatched']
+        conflicts = results['conflict']
         
-        self.logger.info(f"Matching complete: {len(successful_matches)} matched, {len(unmatched_books)} unmatched, {len(conflicts)} conflicts")
+        self.logger.info(
+            "Matching complete: %d matched, %d unmatched, %d conflicts",
+            len(successful_matches), len(unmatched_books), len(conflicts)
+        )
         
         self.unmatched_books = unmatched_books
         self.conflicts = conflicts
@@ -259,37 +589,8 @@ class BookMatcher:
                 "file_path": None
             }
         
-        # Create detailed report
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        report = f"Books with Collections - No Match Found\n"
-        report += f"======================================\n"
-        report += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        report += f"Books with collections but no match: {len(books_with_collections)}\n"
-        report += f"Total unmatched books: {len(self.unmatched_books)}\n"
-        report += f"Books without collections (expected): {len(self.unmatched_books) - len(books_with_collections)}\n\n"
-        
-        report += f"These books have collections in Kobo but could not be matched to any Calibre library.\n"
-        report += f"This usually indicates title/author differences or missing books in Calibre.\n\n"
-        
-        # Add detailed book list
-        report += f"Detailed Analysis:\n"
-        report += f"{'='*60}\n\n"
-        
-        for i, book in enumerate(books_with_collections, 1):
-            report += f"{i:3d}. Title: {book.title}\n"
-            report += f"     Author: {book.author}\n"
-            report += f"     Collections: {', '.join(book.collections) if book.collections else 'None'}\n"
-            report += f"     Read Status: {book.read_status} (0=unread, 1=reading, 2=finished)\n"
-            report += f"     Progress: {book.percent_read}%\n"
-            if book.date_last_read:
-                report += f"     Last Read: {book.date_last_read}\n"
-            report += f"     Possible reasons for no match:\n"
-            report += f"       - Title or author name differs between Kobo and Calibre\n"
-            report += f"       - Book may not exist in any Calibre library\n"
-            report += f"       - Author name format differences (e.g., 'Last, First' vs 'First Last')\n"
-            report += "-" * 70 + "\n\n"
-        
         # Save to file
         logs_dir = Path("logs")
         logs_dir.mkdir(exist_ok=True)
@@ -297,10 +598,38 @@ class BookMatcher:
         file_path = logs_dir / f"unmatched_books_{timestamp}.txt"
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(report)
+            # Stream the detailed report straight to disk rather than building it in memory
+            with open(file_path, 'w', encoding='utf-8', buffering=65536) as f:
+                f.write(
+                    f"Books with Collections - No Match Found\n"
+                    f"======================================\n"
+                    f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"Books with collections but no match: {len(books_with_collections)}\n"
+                    f"Total unmatched books: {len(self.unmatched_books)}\n"
+                    f"Books without collections (expected): {len(self.unmatched_books) - len(books_with_collections)}\n\n"
+                    f"These books have collections in Kobo but could not be matched to any Calibre library.\n"
+                    f"This usually indicates title/author differences or missing books in Calibre.\n\n"
+                    f"Detailed Analysis:\n"
+                    f"{'='*60}\n\n"
+                )
+                
+                for i, book in enumerate(books_with_collections, 1):
+                    last_read = f"     Last Read: {book.date_last_read}\n" if book.date_last_read else ""
+                    f.write(
+                        f"{i:3d}. Title: {book.title}\n"
+                        f"     Author: {book.author}\n"
+                        f"     Collections: {', '.join(book.collections) if book.collections else 'None'}\n"
+                        f"     Read Status: {book.read_status} (0=unread, 1=reading, 2=finished)\n"
+                        f"     Progress: {book.percent_read}%\n"
+                        f"{last_read}"
+                        f"     Possible reasons for no match:\n"
+                        f"       - Title or author name differs between Kobo and Calibre\n"
+                        f"       - Book may not exist in any Calibre library\n"
+                        f"       - Author name format differences (e.g., 'Last, First' vs 'First Last')\n"
+                        f"{'-' * 70}\n\n"
+                    )
             
-            self.logger.info(f"Unmatched books report saved to: {file_path}")
+            self.logger.info("Unmatched books report saved to: %s", file_path)
             
             # Return summary for display + file path
             no_collections = len(self.unmatched_books) - len(books_with_collections)
@@ -325,7 +654,7 @@ class BookMatcher:
             }
             
         except Exception as e:
-            self.logger.error(f"Failed to save unmatched books report: {e}")
+            self.logger.error("Failed to save unmatched books report: %s", e)
             return {
                 "summary": f"Failed to save detailed report. {len(self.unmatched_books)} books unmatched.",
                 "file_path": None
@@ -2,20 +2,74 @@
 Calibre Updater - Update custom columns in Calibre libraries
 """
 
+import os
 import subprocess
 import sqlite3
 import logging
+import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime
 
 from book_matcher import BookMatch
 from library_manager import CalibreLibrary
 
 
+# Kobo collection names (lowercased) that are ratings, mapped to the Calibre rating
+# they are stored as; both "| "-prefixed and plain forms occur
+_RATING_DISPLAY = {
+    "| evergreen": "Evergreen",
+    "| absolute favorite": "Absolute Favorite",
+    "| favorite": "Favorites",
+    "| good": "Great",
+    "evergreen": "Evergreen",
+    "absolute favorite": "Absolute Favorite",
+    "favorites": "Favorites",
+    "great": "Great",
+    "favorite": "Favorites",
+}
+
+# Rating names, with any prefix removed, that are never treated as genres
+_RATING_NAMES = frozenset({"evergreen", "absolute favorite", "favorites", "great", "favorite", "good"})
+
+# Install locations checked when calibredb isn't on PATH
+_CALIBREDB_FALLBACK_PATHS = (
+    '/Applications/calibre.app/Contents/MacOS/calibredb',  # macOS app install
+    '/usr/bin/calibredb',  # Linux system install
+    '/usr/local/bin/calibredb',  # Linux user install
+    'C:\\Program Files\\Calibre2\\calibredb.exe',  # Windows
+)
+
+
+@lru_cache(maxsize=1)
+def _locate_calibredb() -> str:
+    """Find calibredb without running it; the result is cached, a failure is retried next call."""
+    found = shutil.which('calibredb')
+    if found:
+        return found
+    
+    for path in _CALIBREDB_FALLBACK_PATHS:
+        if os.path.isfile(path) and os.access(path, os.X_OK):
+            return path
+    
+    raise FileNotFoundError("calibredb not found")
+
+
+@dataclass
+class BulkStats:
+    """Outcome of a bulk metadata update."""
+    total: int = 0
+    successful: int = 0
+    failed: int = 0
+    libraries_updated: Set[str] = field(default_factory=set)
+
+
 class CalibreUpdater:
-    """Updates Calibre metadata using calibredb commands."""
+    """Updates Calibre metadata, writing custom columns directly to metadata.db."""
     
     def __init__(self):
         """Initialize Calibre updater."""
@@ -23,53 +77,50 @@ class CalibreUpdater:
         self.backup_dir = Path("backups")
         self.backup_dir.mkdir(exist_ok=True)
         self.calibredb_path = self._find_calibredb_path()
+        
+        # Cached connections to each library's metadata.db, and its custom column ids by label
+        self._conns: Dict[Path, sqlite3.Connection] = {}
+        self._read_conns: Dict[Path, sqlite3.Connection] = {}
+        self._column_ids: Dict[Path, Dict[str, int]] = {}
+        # check_custom_columns results keyed by (metadata.db path, mtime)
+        self._column_cache: Dict[Tuple[str, float], Dict[str, bool]] = {}
+        # Invariant start of each library's set_metadata command, keyed by library path
+        self._set_metadata_prefixes: Dict[str, Tuple[str, ...]] = {}
     
     def _find_calibredb_path(self) -> str:
         """Find calibredb executable path."""
-        # Common paths where calibredb might be found
-        possible_paths = [
-            'calibredb',  # If in PATH
-            '/Applications/calibre.app/Contents/MacOS/calibredb',  # macOS app install
-            '/usr/bin/calibredb',  # Linux system install
-            '/usr/local/bin/calibredb',  # Linux user install
-            'C:\\Program Files\\Calibre2\\calibredb.exe',  # Windows
-        ]
-        
-        for path in possible_paths:
-            try:
-                result = subprocess.run([path, '--version'], 
-                                      capture_output=True, text=True, timeout=5)
-                if result.returncode == 0:
-                    self.logger.info(f"Found calibredb at: {path}")
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
-                continue
+        try:
+            path = _locate_calibredb()
+        except FileNotFoundError:
+            self.logger.error("calibredb not found in any common locations")
+            raise RuntimeError("calibredb executable not found. Please ensure Calibre is installed.")
         
-        self.logger.error("calibredb not found in any common locations")
-        raise RuntimeError("calibredb executable not found. Please ensure Calibre is installed.")
+        self.logger.info(f"Found calibredb at: {path}")
+        return path
     
     def _log_calibredb_error(self, operation: str, cmd: List[str], result: subprocess.CompletedProcess):
         """Log detailed error information for calibredb command failures."""
         self.logger.error(f"Failed to {operation}")
         self.logger.error(f"Command: {' '.join(cmd)}")
         self.logger.error(f"Return code: {result.returncode}")
+        # Output is captured as bytes and only decoded here, on failure
         if result.stderr:
-            self.logger.error(f"Error output: {result.stderr.strip()}")
+            self.logger.error(f"Error output: {result.stderr.decode('utf-8', 'replace').strip()}")
         if result.stdout:
-            self.logger.error(f"Standard output: {result.stdout.strip()}")
+            self.logger.error(f"Standard output: {result.stdout.decode('utf-8', 'replace').strip()}")
     
     def test_calibredb_connection(self, library: CalibreLibrary) -> bool:
         """Test if calibredb can connect to the library."""
         try:
-            cmd = [self.calibredb_path, 'list', '--library-path', str(library.path), '--limit', '1']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            cmd = [self.calibredb_path, 'list', '--library-path', library.path_str, '--limit', '1']
+            result = subprocess.run(cmd, capture_output=True, timeout=10)
             
             if result.returncode == 0:
-                self.logger.debug(f"Successfully connected to {library.name}")
+                self.logger.debug("Successfully connected to %s", library.name)
                 return True
             else:
                 # Check for specific Calibre running error
-                if "Another calibre program" in result.stderr:
+                if b"Another calibre program" in result.stderr:
                     self.logger.error(
                         f"❌ Cannot access {library.name}: Calibre GUI or server is running.\n"
                         f"   Please close the Calibre application and try again.\n"
@@ -93,7 +144,17 @@ class CalibreUpdater:
             backup_name = f"{library.name}_metadata_{timestamp}.db"
             backup_path = self.backup_dir / backup_name
             
-            shutil.copy2(library.metadata_db_path, backup_path)
+            # Copy through SQLite's online backup so the snapshot is consistent
+            # even if the library is written to while it is taken
+            try:
+                backup_conn = sqlite3.connect(backup_path)
+                try:
+                    self._open_library_conn(library, read_only=True).backup(backup_conn, pages=1024)
+                finally:
+                    backup_conn.close()
+            except sqlite3.Error as e:
+                self.logger.warning(f"SQLite backup of {library.name} failed ({e}), copying the file instead")
+                self._copy_file(library.metadata_db_path, backup_path)
             self.logger.info(f"Created backup: {backup_path}")
             return True
             
@@ -101,21 +162,86 @@ class CalibreUpdater:
             self.logger.error(f"Failed to backup {library.name}: {e}")
             return False
     
+    def _copy_file(self, source: Path, destination: Path) -> None:
+        """Copy a file and its metadata, in the kernel via copy_file_range where available."""
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                    remaining = os.fstat(src.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                        if copied == 0:
+                            # Source shrank or the kernel stopped short; copy it again below
+                            raise OSError(f"short copy, {remaining} bytes left")
+                        remaining -= copied
+                shutil.copystat(source, destination)
+                return
+            except OSError as e:
+                self.logger.debug("copy_file_range failed for %s, falling back to copy2: %s", source, e)
+        
+        # Elsewhere, or after a failed kernel copy, shutil uses the platform's
+        # fast copy (fcopyfile on macOS)
+        shutil.copy2(source, destination)
+    
+    def _open_library_conn(self, library: CalibreLibrary, read_only: bool = False) -> sqlite3.Connection:
+        """
+        Get the cached connection to a library's metadata.db, opening it on first use.
+        
+        Column checks, verification and backups use a separate read-only
+        connection, so they can never modify the library.
+        """
+        conns = self._read_conns if read_only else self._conns
+        conn = conns.get(library.metadata_db_path)
+        if conn is None:
+            # Opened on a bulk_update worker thread but closed from the caller's
+            if read_only:
+                db_uri = f"{library.metadata_db_path.resolve().as_uri()}?mode=ro"
+                conn = sqlite3.connect(db_uri, uri=True, timeout=30, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(library.metadata_db_path, timeout=30, check_same_thread=False)
+            # Larger page cache and memory-mapped reads for the repeated column lookups
+            for pragma in ("synchronous=NORMAL", "cache_size=-64000", "temp_store=MEMORY", "mmap_size=268435456"):
+                conn.execute(f"PRAGMA {pragma}")
+            conns[library.metadata_db_path] = conn
+        return conn
+    
+    def _column_id(self, library: CalibreLibrary, label: str) -> Optional[int]:
+        """Look up a custom column's id by label, loading the library's labels once."""
+        column_ids = self._column_ids.get(library.metadata_db_path)
+        if column_ids is None:
+            cursor = self._open_library_conn(library, read_only=True).execute("SELECT label, id FROM custom_columns")
+            column_ids = dict(cursor.fetchall())
+            self._column_ids[library.metadata_db_path] = column_ids
+        return column_ids.get(label)
+    
+    def close(self) -> None:
+        """Close cached library connections."""
+        for conn in (*self._conns.values(), *self._read_conns.values()):
+            conn.close()
+        self._conns = {}
+        self._read_conns = {}
+        self._column_ids = {}
+    
     def check_custom_columns(self, library: CalibreLibrary) -> Dict[str, bool]:
         """Check if required custom columns exist in library."""
         try:
-            conn = sqlite3.connect(library.metadata_db_path)
-            cursor = conn.cursor()
+            # Reuse the last result until metadata.db changes
+            cache_key = (str(library.metadata_db_path), library.metadata_db_path.stat().st_mtime)
+            cached = self._column_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
+            cursor = self._open_library_conn(library, read_only=True).cursor()
             
             cursor.execute("SELECT label, name FROM custom_columns")
             existing_columns = cursor.fetchall()
-            conn.close()
             
-            # Create mapping of labels to display names for debugging
-            column_map = {row[0]: row[1] for row in existing_columns}
             labels = [row[0] for row in existing_columns]
             
-            self.logger.info(f"📋 Found custom columns in {library.name}: {column_map}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                # Mapping of labels to display names for debugging
+                column_map = {row[0]: row[1] for row in existing_columns}
+                self.logger.debug("📋 Found custom columns in %s: %s", library.name, column_map)
             
             result = {
                 'my_ratings': 'myratings' in labels,
@@ -123,9 +249,10 @@ class CalibreUpdater:
             }
             
             self.logger.info(f"✅ Column check results for {library.name}: {result}")
+            self._column_cache[cache_key] = result
             return result
             
-        except sqlite3.Error as e:
+        except (sqlite3.Error, OSError) as e:
             self.logger.error(f"Error checking custom columns: {e}")
             return {'my_ratings': False, 'my_genres': False}
     
@@ -136,7 +263,7 @@ class CalibreUpdater:
             
             cmd = [
                 self.calibredb_path, 'add_custom_column',
-                '--library-path', str(library.path),
+                '--library-path', library.path_str,
                 column_name,
                 display_name,
                 'text',
@@ -144,15 +271,17 @@ class CalibreUpdater:
                 '--is-multiple'
             ]
             
-            self.logger.debug(f"Column creation command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Column creation command: %s", ' '.join(cmd))
+            result = subprocess.run(cmd, capture_output=True, timeout=30)
             
             if result.returncode == 0:
                 self.logger.info(f"✅ Successfully created custom column {column_name} in {library.name}")
+                self._invalidate_column_cache(library)
                 return True
             else:
                 # Check if column already exists
-                if "already exists" in result.stderr.lower():
+                if b"already exists" in result.stderr.lower():
                     self.logger.info(f"✅ Custom column {column_name} already exists in {library.name}")
                     return True
                 self._log_calibredb_error("create custom column", cmd, result)
@@ -165,6 +294,16 @@ class CalibreUpdater:
             self.logger.error(f"Error creating custom column {column_name}: {e}")
             return False
     
+    def _invalidate_column_cache(self, library: CalibreLibrary) -> None:
+        """Drop cached column checks for a library after its columns change."""
+        self._column_ids.pop(library.metadata_db_path, None)
+        db_path = str(library.metadata_db_path)
+        # Libraries are processed on a thread pool, so iterate over a snapshot
+        # while other threads may be adding their own entries
+        for key in tuple(self._column_cache):
+            if key[0] == db_path:
+                self._column_cache.pop(key, None)
+    
     def ensure_custom_columns(self, library: CalibreLibrary) -> bool:
         """Ensure required custom columns exist."""
         columns = self.check_custom_columns(library)
@@ -191,176 +330,258 @@ class CalibreUpdater:
         """Update a single book's metadata."""
         try:
             # Separate rating and genre collections
-            rating_collections = self._get_rating_collections(match.kobo_book.collections)
-            genre_collections = self._get_genre_collections(match.kobo_book.collections)
+            rating_collections, genre_collections = self._split_collections(match.kobo_book.collections)
             
-            # Update My Ratings column
+            # Update My Ratings and My Genres with one calibredb call
+            columns = {}
             if rating_collections:
-                if not self._update_custom_column(
-                    match.library, 
-                    match.calibre_book_id, 
-                    'myratings', 
-                    rating_collections
-                ):
-                    return False
-            
-            # Update My Genres column
+                columns['myratings'] = rating_collections
             if genre_collections:
-                if not self._update_custom_column(
-                    match.library, 
-                    match.calibre_book_id, 
-                    'my_genres', 
-                    genre_collections
-                ):
-                    return False
-            
-            self.logger.debug(f"Updated book ID {match.calibre_book_id} in {match.library.name}")
+                columns['my_genres'] = genre_collections
+            
+            if columns and not self._update_custom_columns(match.library, match.calibre_book_id, columns):
+                return False
+            
+            self.logger.debug("Updated book ID %s in %s", match.calibre_book_id, match.library.name)
             return True
             
         except Exception as e:
             self.logger.error(f"Error updating book metadata: {e}")
             return False
     
-    def _get_rating_collections(self, collections: List[str]) -> List[str]:
-        """Filter collections to get only rating collections."""
-        # Handle both prefixed and non-prefixed collection names from Kobo
-        rating_patterns = [
-            "| evergreen", "| absolute favorite", "| favorite", "| good",
-            "evergreen", "absolute favorite", "favorites", "great", "favorite"
-        ]
-        matched_collections = []
-        for col in collections:
-            col_lower = col.lower().strip()
-            if col_lower in [p.lower() for p in rating_patterns]:
-                # Clean up the collection name for Calibre
-                clean_name = col_lower.replace("| ", "").title()
-                if clean_name == "Favorite":
-                    clean_name = "Favorites"
-                elif clean_name == "Good":
-                    clean_name = "Great"
-                matched_collections.append(clean_name)
-        
-        self.logger.debug(f"Rating collections found: {matched_collections} from {collections}")
-        return matched_collections
-    
-    def _get_genre_collections(self, collections: List[str]) -> List[str]:
-        """Filter collections to get only genre collections."""
-        # Get rating collections to exclude them
-        rating_collections = self._get_rating_collections(collections)
-        rating_patterns_lower = [r.lower() for r in rating_collections]
+    def _split_collections(self, collections: Sequence[str]) -> Tuple[str, str]:
+        """
+        Split a book's collections into ratings and genres in a single pass.
         
-        genre_collections = []
+        Returns:
+            Tuple of (ratings, genres), each a comma-separated string without duplicates
+        """
+        ratings = {}
+        genres = {}
         for col in collections:
-            col_clean = col.replace("| ", "").strip()
-            if col_clean.lower() not in rating_patterns_lower and col_clean.lower() not in [
-                "evergreen", "absolute favorite", "favorites", "great", "favorite", "good"
-            ]:
-                genre_collections.append(col_clean)
+            # One lookup both detects a rating and gives its Calibre name
+            rating = _RATING_DISPLAY.get(col.lower().strip())
+            if rating is not None:
+                ratings[rating] = None
+            else:
+                # Every cleaned rating name is in _RATING_NAMES, so one lookup excludes them all
+                col_clean = col.replace("| ", "").strip()
+                if col_clean.lower() not in _RATING_NAMES:
+                    genres[col_clean] = None
         
-        self.logger.debug(f"Genre collections found: {genre_collections} from {collections}")
-        return genre_collections
+        rating_string = ','.join(ratings)
+        genre_string = ','.join(genres)
+        self.logger.debug("Ratings %s and genres %s found from %s", rating_string, genre_string, collections)
+        return rating_string, genre_string
     
-    def _update_custom_column(self, library: CalibreLibrary, book_id: int, column: str, values: List[str]) -> bool:
-        """Update a custom column for a specific book."""
+    def _update_custom_columns(self, library: CalibreLibrary, book_id: int, columns: Dict[str, str]) -> bool:
+        """
+        Update several custom columns for a specific book with a single calibredb call.
+        
+        Args:
+            columns: Column label -> comma-separated values (Calibre splits multiple values on commas)
+        """
+        column_names = ', '.join(columns)
         try:
-            # Join values with comma for multiple values (Calibre expects comma-separated values)
-            if not values:
-                self.logger.debug(f"No values to update for {column} on book {book_id}")
+            value_strings = {column: value_string for column, value_string in columns.items() if value_string}
+            if not value_strings:
+                self.logger.debug("No values to update for %s on book %s", column_names, book_id)
                 return True
-                
-            value_string = ','.join(values)
-            self.logger.debug(f"Updating book {book_id} {column} with: {value_string}")
             
             # Use proper calibredb syntax with #column_name: prefix for custom columns
-            cmd = [
-                self.calibredb_path, 'set_metadata',
-                '--library-path', str(library.path),
-                str(book_id),
-                '--field', f'#{column}:{value_string}'
-            ]
+            cmd = [*self._set_metadata_prefix(library), str(book_id)]
+            for column, value_string in value_strings.items():
+                self.logger.debug("Updating book %s %s with: %s", book_id, column, value_string)
+                cmd.extend(['--field', f'#{column}:{value_string}'])
             
-            self.logger.debug(f"Update command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Update command: %s", ' '.join(cmd))
+            result = subprocess.run(cmd, capture_output=True, timeout=30)
             
             if result.returncode == 0:
-                self.logger.debug(f"✅ Successfully updated #{column} for book {book_id} with: {value_string}")
+                self.logger.debug("✅ Successfully updated %s for book %s", column_names, book_id)
                 return True
             else:
-                self._log_calibredb_error(f"update {column}", cmd, result)
+                self._log_calibredb_error(f"update {column_names}", cmd, result)
                 return False
                 
         except subprocess.TimeoutExpired:
-            self.logger.error(f"Timeout updating {column} for book {book_id} (command took > 30s)")
+            self.logger.error(f"Timeout updating {column_names} for book {book_id} (command took > 30s)")
             return False
         except Exception as e:
-            self.logger.error(f"Error updating custom column {column} for book {book_id}: {e}")
+            self.logger.error(f"Error updating custom columns {column_names} for book {book_id}: {e}")
             return False
     
-    def bulk_update(self, matches: List[BookMatch]) -> Dict[str, int]:
+    def _set_metadata_prefix(self, library: CalibreLibrary) -> Tuple[str, ...]:
+        """The part of a set_metadata command shared by every book in a library."""
+        prefix = self._set_metadata_prefixes.get(library.path_str)
+        if prefix is None:
+            prefix = (self.calibredb_path, 'set_metadata', '--library-path', library.path_str)
+            self._set_metadata_prefixes[library.path_str] = prefix
+        return prefix
+    
+    def _update_custom_column(self, library: CalibreLibrary, book_id: int, column: str, value_string: str) -> bool:
+        """Update a custom column for a specific book."""
+        return self._update_custom_columns(library, book_id, {column: value_string})
+    
+    def _get_writable_columns(self, conn: sqlite3.Connection) -> Dict[str, Tuple[int, bool]]:
+        """Map the sync columns stored as plain text columns to (column id, is_multiple)."""
+        cursor = conn.execute(
+            "SELECT label, id, is_multiple FROM custom_columns "
+            "WHERE label IN ('myratings', 'my_genres') AND datatype = 'text' AND normalized = 1"
+        )
+        return {label: (column_id, bool(is_multiple)) for label, column_id, is_multiple in cursor}
+    
+    def _write_custom_column(self, conn: sqlite3.Connection, column_id: int, is_multiple: bool,
+                             updates: List[Tuple[int, str]]) -> None:
+        """Replace a custom column's values for each (book_id, value_string) pair, as calibredb set_metadata does."""
+        table_name = f"custom_column_{column_id}"
+        link_table_name = f"books_custom_column_{column_id}_link"
+        
+        links = []
+        for book_id, value_string in updates:
+            if is_multiple:
+                # calibredb splits multiple-value fields on commas
+                book_values = dict.fromkeys(v.strip() for v in value_string.split(',') if v.strip())
+            else:
+                book_values = (value_string.strip(),)
+            links.extend((book_id, value) for value in book_values)
+        
+        # One statement for all books, with the ids passed in as a JSON array
+        conn.execute(
+            f"DELETE FROM {link_table_name} WHERE book IN (SELECT value FROM json_each(?))",
+            (json.dumps([book_id for book_id, _ in updates]),)
+        )
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table_name} (value) VALUES (?)",
+            [(value,) for value in dict.fromkeys(value for _, value in links)]
+        )
+        # Look the value ids up in SQL so the column's NOCASE collation decides which value is reused
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {link_table_name} (book, value) SELECT ?, id FROM {table_name} WHERE value = ?",
+            links
+        )
+    
+    def _write_library_metadata(self, library: CalibreLibrary, matches: List[BookMatch]) -> Optional[bool]:
+        """
+        Write ratings and genres for all of a library's matches directly to metadata.db.
+        
+        Everything is written in a single transaction, so either every book is
+        updated or none are.
+        
+        Returns:
+            True on success, False on failure, or None if the columns aren't plain
+            text columns and have to be updated through calibredb instead.
+        """
+        try:
+            conn = self._open_library_conn(library)
+            columns = self._get_writable_columns(conn)
+            if len(columns) < 2:
+                return None
+            
+            rating_updates = []
+            genre_updates = []
+            for match in matches:
+                rating_collections, genre_collections = self._split_collections(match.kobo_book.collections)
+                if rating_collections:
+                    rating_updates.append((match.calibre_book_id, rating_collections))
+                if genre_collections:
+                    genre_updates.append((match.calibre_book_id, genre_collections))
+            
+            with conn:
+                for column, updates in (('myratings', rating_updates), ('my_genres', genre_updates)):
+                    if updates:
+                        column_id, is_multiple = columns[column]
+                        self._write_custom_column(conn, column_id, is_multiple, updates)
+                
+                # Have Calibre refresh the OPF backups of the changed books
+                conn.execute(
+                    "INSERT OR IGNORE INTO metadata_dirtied (book) SELECT DISTINCT value FROM json_each(?)",
+                    (json.dumps([book_id for book_id, _ in rating_updates + genre_updates]),)
+                )
+            
+            self.logger.info(f"Wrote metadata for {len(matches)} books in {library.name}")
+            return True
+            
+        except sqlite3.Error as e:
+            self.logger.error(f"Error writing metadata to {library.name}: {e}")
+            return False
+    
+    def _process_library(self, library: CalibreLibrary, library_matches: List[BookMatch]) -> Tuple[int, int, bool]:
+        """
+        Check, back up and update one library.
+        
+        Returns:
+            Tuple of (successful, failed, library_updated)
+        """
+        self.logger.info(f"Updating {len(library_matches)} books in {library.name}")
+        
+        # Test calibredb connection to library
+        if not self.test_calibredb_connection(library):
+            self.logger.error(f"Skipping {library.name} due to connection failure")
+            return 0, len(library_matches), False
+        
+        # Backup library before changes
+        if not self.backup_library(library):
+            self.logger.error(f"Skipping {library.name} due to backup failure")
+            return 0, len(library_matches), False
+        
+        # Ensure custom columns exist
+        if not self.ensure_custom_columns(library):
+            self.logger.error(f"Failed to ensure custom columns in {library.name}")
+            return 0, len(library_matches), False
+        
+        # Update every book in one transaction; columns calibredb created with a
+        # non-text layout are still updated one book at a time through calibredb
+        written = self._write_library_metadata(library, library_matches)
+        if written is None:
+            # One calibredb call per book, run serially: concurrent calibredb writers
+            # would compete for this library's write lock (libraries already run in parallel)
+            successful = sum(map(self.update_book_metadata, library_matches))
+            return successful, len(library_matches) - successful, True
+        if written:
+            return len(library_matches), 0, True
+        return 0, len(library_matches), False
+    
+    def bulk_update(self, matches: List[BookMatch]) -> BulkStats:
         """Update multiple books and return statistics."""
-        stats = {
-            'total': len(matches),
-            'successful': 0,
-            'failed': 0,
-            'libraries_updated': set()
-        }
+        stats = BulkStats(total=len(matches))
         
-        # Group matches by library for efficient processing
-        by_library = {}
+        # Group matches by library for efficient processing; CalibreLibrary isn't
+        # hashable, so key on the object's identity
+        by_library: Dict[int, Tuple[CalibreLibrary, List[BookMatch]]] = {}
         for match in matches:
-            lib_name = match.library.name
-            if lib_name not in by_library:
-                by_library[lib_name] = []
-            by_library[lib_name].append(match)
+            by_library.setdefault(id(match.library), (match.library, []))[1].append(match)
         
-        # Process each library
-        for library_name, library_matches in by_library.items():
-            library = library_matches[0].library  # Get library object
-            
-            self.logger.info(f"Updating {len(library_matches)} books in {library_name}")
-            
-            # Test calibredb connection to library
-            if not self.test_calibredb_connection(library):
-                self.logger.error(f"Skipping {library_name} due to connection failure")
-                stats['failed'] += len(library_matches)
-                continue
-            
-            # Backup library before changes
-            if not self.backup_library(library):
-                self.logger.error(f"Skipping {library_name} due to backup failure")
-                stats['failed'] += len(library_matches)
-                continue
-            
-            # Ensure custom columns exist
-            if not self.ensure_custom_columns(library):
-                self.logger.error(f"Failed to ensure custom columns in {library_name}")
-                stats['failed'] += len(library_matches)
-                continue
-            
-            # Update each book
-            for match in library_matches:
-                if self.update_book_metadata(match):
-                    stats['successful'] += 1
-                else:
-                    stats['failed'] += 1
-            
-            stats['libraries_updated'].add(library_name)
+        # Libraries are separate databases, so they are processed concurrently
+        total_successful = total_failed = 0
+        try:
+            with ThreadPoolExecutor(max_workers=min(8, len(by_library) or 1), thread_name_prefix="library-update") as pool:
+                futures = {
+                    pool.submit(self._process_library, library, library_matches): library.name
+                    for library, library_matches in by_library.values()
+                }
+                
+                for future in as_completed(futures):
+                    successful, failed, library_updated = future.result()
+                    total_successful += successful
+                    total_failed += failed
+                    if library_updated:
+                        stats.libraries_updated.add(futures[future])
+        finally:
+            self.close()
+        
+        stats.successful = total_successful
+        stats.failed = total_failed
         
-        self.logger.info(f"Bulk update complete: {stats['successful']} successful, {stats['failed']} failed")
+        self.logger.info(f"Bulk update complete: {stats.successful} successful, {stats.failed} failed")
         return stats
     
     def _verify_column_exists(self, library: CalibreLibrary, column_name: str) -> bool:
         """Verify that a custom column actually exists in the library."""
         try:
-            conn = sqlite3.connect(library.metadata_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT label FROM custom_columns WHERE label = ?", (column_name,))
-            result = cursor.fetchone()
-            conn.close()
-            
-            exists = result is not None
-            self.logger.debug(f"Column {column_name} exists in {library.name}: {exists}")
+            exists = self._column_id(library, column_name) is not None
+            self.logger.debug("Column %s exists in %s: %s", column_name, library.name, exists)
             return exists
             
         except sqlite3.Error as e:
@@ -369,41 +590,46 @@ class CalibreUpdater:
     
     def _verify_column_update(self, library: CalibreLibrary, book_id: int, column: str, expected_value: str) -> bool:
         """Verify that a custom column update actually worked by reading it back."""
+        return self._verify_column_updates(library, column, {book_id: expected_value}).get(book_id, False)
+    
+    def _verify_column_updates(self, library: CalibreLibrary, column: str, expected_values: Dict[int, str]) -> Dict[int, bool]:
+        """Verify a custom column for several books at once, reading all of them back in one query."""
         try:
-            conn = sqlite3.connect(library.metadata_db_path)
-            cursor = conn.cursor()
-            
             # Find the custom column table name
-            cursor.execute("SELECT id FROM custom_columns WHERE label = ?", (column,))
-            column_result = cursor.fetchone()
-            if not column_result:
-                conn.close()
-                self.logger.debug(f"Column {column} not found in custom_columns table")
-                return False
+            column_id = self._column_id(library, column)
+            if column_id is None:
+                self.logger.debug("Column %s not found in custom_columns table", column)
+                return {}
             
-            column_id = column_result[0]
             table_name = f"custom_column_{column_id}"
             
-            # Get the current value
-            cursor.execute(f"SELECT value FROM {table_name} WHERE book = ?", (book_id,))
-            value_result = cursor.fetchone()
-            conn.close()
-            
-            if value_result:
-                current_value = value_result[0] or ""
-                matches = current_value == expected_value
-                self.logger.debug(f"Book {book_id} {column}: expected '{expected_value}', got '{current_value}', matches: {matches}")
-                return matches
-            else:
-                self.logger.debug(f"No value found for book {book_id} in {column}")
-                return False
+            # Get the current values, keeping the first row per book
+            book_ids = list(expected_values)
+            placeholders = ','.join('?' * len(book_ids))
+            cursor = self._open_library_conn(library, read_only=True).cursor()
+            cursor.execute(f"SELECT book, value FROM {table_name} WHERE book IN ({placeholders})", book_ids)
+            current_values = {}
+            for book_id, value in cursor:
+                current_values.setdefault(book_id, value)
+            
+            results = {}
+            for book_id, expected_value in expected_values.items():
+                if book_id in current_values:
+                    current_value = current_values[book_id] or ""
+                    matches = current_value == expected_value
+                    self.logger.debug("Book %s %s: expected '%s', got '%s', matches: %s", book_id, column, expected_value, current_value, matches)
+                    results[book_id] = matches
+                else:
+                    self.logger.debug("No value found for book %s in %s", book_id, column)
+                    results[book_id] = False
+            return results
                 
         except sqlite3.Error as e:
-            self.logger.debug(f"Error verifying column update (non-critical): {e}")
-            return False  # Non-critical, don't fail the update
+            self.logger.debug("Error verifying column update (non-critical): %s", e)
+            return {}  # Non-critical, don't fail the update
         except Exception as e:
-            self.logger.debug(f"Error verifying column update (non-critical): {e}")
-            return False
+            self.logger.debug("Error verifying column update (non-critical): %s", e)
+            return {}
     
     def test_column_update(self, library: CalibreLibrary, test_book_id: int = 1) -> bool:
         """Test updating a custom column to verify the fix works."""
@@ -411,7 +637,7 @@ class CalibreUpdater:
             self.logger.info(f"🧪 Testing column update capability for {library.name}")
             
             # Test with a simple rating value
-            test_result = self._update_custom_column(library, test_book_id, 'myratings', ['Test'])
+            test_result = self._update_custom_column(library, test_book_id, 'myratings', 'Test')
             
             if test_result:
                 self.logger.info(f"✅ Column update test PASSED for {library.name}")
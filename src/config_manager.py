@@ -2,11 +2,89 @@
 Configuration Manager - Handle configuration and library mappings
 """
 
+import copy
 import json
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:  # Optional; only speeds up config loading and saving
+    orjson = None
+
+
+def _loads(data: bytes) -> Dict:
+    """Parse JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(data: Dict) -> bytes:
+    """Serialize JSON indented for hand editing, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _default_library_mappings() -> Dict:
+    """Default library mappings; built on demand since the search paths depend on the environment."""
+    return {
+        "search_paths": [
+            str(Path.home() / "Documents"),
+            str(Path.home() / "Downloads"),
+            str(Path.cwd())
+        ],
+        "discovered_libraries": {},
+        "primary_library": "",
+        "kobo_database_path": "KoboReader.sqlite"
+    }
+
+
+# Default rating collections
+_DEFAULT_RATING_COLLECTIONS = {
+    "rating_collections": {
+        "Evergreen": "Evergreen",
+        "Absolute Favorite": "Absolute Favorite",
+        "Favorites": "Favorites", 
+        "Great": "Great"
+    },
+    "custom_columns": {
+        "ratings_column": "my_ratings",
+        "genres_column": "my_genres"
+    }
+}
+
+# Default sync preferences
+_DEFAULT_SYNC_PREFERENCES = {
+    "matching": {
+        "strict_matching": True,
+        "strict_primary_only": False,
+        "manual_conflict_resolution": True,
+        "skip_uncertain_matches": True
+    },
+    "backup": {
+        "backup_metadata_db": True,
+        "backup_directory": "backups"
+    },
+    "logging": {
+        "level": "INFO",
+        "file_logging": True,
+        "console_logging": True
+    },
+    "ui": {
+        "dry_run_optional": True,
+        "verbose_progress": True,
+        "gui_enabled": True
+    },
+    "conflict_resolution": {
+        "default_action": "ask_user",
+        "remember_choices": True,
+        "auto_apply_similar": False
+    }
+}
+
 
 class ConfigManager:
     """Manages configuration files and user preferences."""
@@ -22,78 +100,37 @@ class ConfigManager:
         self.rating_collections_file = self.config_dir / "rating_collections.json"
         self.sync_preferences_file = self.config_dir / "sync_preferences.json"
         
-        # Initialize default configurations
-        self._create_default_configs()
+        # Parsed configuration files, kept until saved or refreshed
+        self._json_cache: Dict[Path, Dict] = {}
+        
+        # Initialize default configurations, unless every file is already there
+        config_files = (self.library_mappings_file, self.rating_collections_file, self.sync_preferences_file)
+        if not all(file_path.exists() for file_path in config_files):
+            self._create_default_configs()
     
     def _create_default_configs(self):
         """Create default configuration files if they don't exist."""
+        defaults = (
+            (self.library_mappings_file, _default_library_mappings()),
+            (self.rating_collections_file, _DEFAULT_RATING_COLLECTIONS),
+            (self.sync_preferences_file, _DEFAULT_SYNC_PREFERENCES)
+        )
         
-        # Default library mappings
-        if not self.library_mappings_file.exists():
-            default_mappings = {
-                "search_paths": [
-                    str(Path.home() / "Documents"),
-                    str(Path.home() / "Downloads"),
-                    str(Path.cwd()),
-                    "/Users/jenniferparsons/Engineering/Projects/kobo-to-calibre"
-                ],
-                "discovered_libraries": {},
-                "primary_library": "",
-                "kobo_database_path": "KoboReader.sqlite"
-            }
-            self._save_json(self.library_mappings_file, default_mappings)
-        
-        # Default rating collections
-        if not self.rating_collections_file.exists():
-            default_ratings = {
-                "rating_collections": {
-                    "Evergreen": "Evergreen",
-                    "Absolute Favorite": "Absolute Favorite",
-                    "Favorites": "Favorites", 
-                    "Great": "Great"
-                },
-                "custom_columns": {
-                    "ratings_column": "my_ratings",
-                    "genres_column": "my_genres"
-                }
-            }
-            self._save_json(self.rating_collections_file, default_ratings)
-        
-        # Default sync preferences
-        if not self.sync_preferences_file.exists():
-            default_prefs = {
-                "matching": {
-                    "strict_matching": True,
-                    "manual_conflict_resolution": True,
-                    "skip_uncertain_matches": True
-                },
-                "backup": {
-                    "backup_metadata_db": True,
-                    "backup_directory": "backups"
-                },
-                "logging": {
-                    "level": "INFO",
-                    "file_logging": True,
-                    "console_logging": True
-                },
-                "ui": {
-                    "dry_run_optional": True,
-                    "verbose_progress": True,
-                    "gui_enabled": True
-                },
-                "conflict_resolution": {
-                    "default_action": "ask_user",
-                    "remember_choices": True,
-                    "auto_apply_similar": False
-                }
-            }
-            self._save_json(self.sync_preferences_file, default_prefs)
+        for file_path, default in defaults:
+            if not file_path.exists():
+                # Saved data is cached and handed to callers, so never share the module defaults
+                self._save_json(file_path, copy.deepcopy(default))
     
     def _load_json(self, file_path: Path) -> Dict:
-        """Load JSON configuration file."""
+        """Load JSON configuration file, parsing it only on first use."""
+        cached = self._json_cache.get(file_path)
+        if cached is not None:
+            return cached
+        
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            data = _loads(file_path.read_bytes())
+            self._json_cache[file_path] = data
+            return data
         except Exception as e:
             self.logger.error(f"Error loading {file_path}: {e}")
             return {}
@@ -101,13 +138,21 @@ class ConfigManager:
     def _save_json(self, file_path: Path, data: Dict) -> bool:
         """Save data to JSON configuration file."""
         try:
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            file_path.write_bytes(_dumps(data))
+            self._json_cache[file_path] = data
             return True
         except Exception as e:
             self.logger.error(f"Error saving {file_path}: {e}")
+            self._json_cache.pop(file_path, None)
             return False
     
+    def refresh(self, file_path: Optional[Path] = None) -> None:
+        """Drop cached configuration so it is re-read from disk (all files if none given)."""
+        if file_path is None:
+            self._json_cache.clear()
+        else:
+            self._json_cache.pop(file_path, None)
+    
     def get_library_mappings(self) -> Dict:
         """Get library mappings configuration."""
         return self._load_json(self.library_mappings_file)
@@ -144,6 +189,14 @@ class ConfigManager:
         mappings["discovered_libraries"] = libraries
         return self.save_library_mappings(mappings)
     
+    def update_discovered_library_info(self, library_info: Dict[str, Dict]) -> bool:
+        """Merge per-library details (book count, custom columns) into discovered libraries."""
+        mappings = self.get_library_mappings()
+        discovered = mappings.setdefault("discovered_libraries", {})
+        for name, info in library_info.items():
+            discovered.setdefault(name, {}).update(info)
+        return self.save_library_mappings(mappings)
+    
     def set_primary_library(self, library_name: str) -> bool:
         """Set the primary library name."""
         mappings = self.get_library_mappings()
@@ -160,6 +213,11 @@ class ConfigManager:
         prefs = self.get_sync_preferences()
         return prefs.get("matching", {}).get("strict_matching", True)
     
+    def is_strict_primary_only_enabled(self) -> bool:
+        """Check if matching is restricted to the primary library."""
+        prefs = self.get_sync_preferences()
+        return prefs.get("matching", {}).get("strict_primary_only", False)
+    
     def is_backup_enabled(self) -> bool:
         """Check if backup is enabled."""
         prefs = self.get_sync_preferences()
@@ -4,23 +4,179 @@ GUI - Tkinter interface for multi-library sync operations
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import os
+import shutil
+import subprocess
+import sys
 import threading
+import time
 import logging
-from typing import List, Dict
+import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Dict, Optional
 
 from config_manager import ConfigManager
 from sync_engine import SyncEngine
 
 
+# Prefix/suffix of the unmatched books reports written to logs/
+UNMATCHED_REPORT_PREFIX = "unmatched_books_"
+UNMATCHED_REPORT_SUFFIX = ".txt"
+
+
+@contextmanager
+def _editable(widget):
+    """Temporarily enable a read-only text widget for programmatic writes."""
+    widget.configure(state=tk.NORMAL)
+    try:
+        yield widget
+    finally:
+        widget.configure(state=tk.DISABLED)
+
+
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the strftime result for records logged in the same second."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_sec = None
+        self._last_time = ""
+    
+    def formatTime(self, record, datefmt=None):
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_time = time.strftime(datefmt or self.default_time_format, self.converter(sec))
+            self._last_sec = sec
+        if datefmt:
+            return self._last_time
+        return self.default_msec_format % (self._last_time, record.msecs)
+
+
+class _ConflictDialog:
+    """Conflict resolution dialog, built once and repopulated for each conflict."""
+    
+    WIDTH = 600
+    HEIGHT = 400
+    
+    def __init__(self, parent: tk.Tk, on_choice: Callable[[Optional[str]], None]):
+        self.on_choice = on_choice
+        self.top = tk.Toplevel(parent)
+        self.top.title("Resolve Conflict")
+        self.top.transient(parent)
+        self.top.withdraw()
+        self.top.protocol("WM_DELETE_WINDOW", lambda: self._finish(None))
+        
+        # Center the dialog
+        x = (self.top.winfo_screenwidth() // 2) - (self.WIDTH // 2)
+        y = (self.top.winfo_screenheight() // 2) - (self.HEIGHT // 2)
+        self.top.geometry(f"{self.WIDTH}x{self.HEIGHT}+{x}+{y}")
+        
+        self.resolution_var = tk.StringVar(value="")
+        
+        # Book info
+        book_frame = ttk.LabelFrame(self.top, text="Book Information")
+        book_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.title_label = ttk.Label(book_frame, font=("TkDefaultFont", 10, "bold"))
+        self.title_label.pack(anchor=tk.W, padx=10, pady=2)
+        self.author_label = ttk.Label(book_frame)
+        self.author_label.pack(anchor=tk.W, padx=10, pady=2)
+        self.collections_label = ttk.Label(book_frame)
+        self.collections_label.pack(anchor=tk.W, padx=10, pady=2)
+        
+        # Conflict info
+        conflict_frame = ttk.LabelFrame(self.top, text="Found in Multiple Libraries")
+        conflict_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        ttk.Label(conflict_frame, text="This book was found in the following libraries:").pack(anchor=tk.W, padx=10, pady=5)
+        
+        # Per-library options are rebuilt for each conflict
+        self.libraries_frame = ttk.Frame(conflict_frame)
+        self.libraries_frame.pack(fill=tk.X)
+        
+        # All libraries option
+        ttk.Radiobutton(
+            conflict_frame,
+            text="Update in ALL libraries",
+            variable=self.resolution_var,
+            value="all"
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        # Skip option
+        ttk.Radiobutton(
+            conflict_frame,
+            text="Skip this book (don't update anywhere)",
+            variable=self.resolution_var,
+            value="skip"
+        ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        # Buttons
+        button_frame = ttk.Frame(self.top)
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        ttk.Button(button_frame, text="OK", command=lambda: self._finish(self.resolution_var.get())).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="Skip All Conflicts", command=lambda: self._finish("skip_all")).pack(side=tk.RIGHT, padx=5)
+    
+    def show(self, conflict):
+        """Show the dialog for one conflict; the chosen action is passed to on_choice."""
+        book = conflict.kobo_book
+        self.title_label.config(text=f"Title: {book.title}")
+        self.author_label.config(text=f"Author: {book.author}")
+        self.collections_label.config(text=f"Collections: {', '.join(book.collections[:5])}")
+        
+        for widget in self.libraries_frame.winfo_children():
+            widget.destroy()
+        
+        for i, match in enumerate(conflict.matches):
+            ttk.Radiobutton(
+                self.libraries_frame,
+                text=f"Update in {match.library.name} library",
+                variable=self.resolution_var,
+                value=f"library_{i}"
+            ).pack(anchor=tk.W, padx=10, pady=2)
+        
+        self.resolution_var.set("")
+        
+        self.top.deiconify()
+        self.top.grab_set()
+    
+    def _finish(self, action: Optional[str]):
+        # Hide rather than destroy; the next conflict reuses the window
+        self.top.grab_release()
+        self.top.withdraw()
+        self.on_choice(action)
+    
+    def destroy(self):
+        self.top.destroy()
+
+
 class KoboSyncGUI:
     """Main GUI application for Kobo-to-Calibre sync."""
     
+    # Scrollback caps for the text areas (oldest lines are dropped first)
+    LOG_MAX_LINES = 5000
+    RESULTS_MAX_LINES = 2000
+    
     def __init__(self, config_manager: ConfigManager):
         """Initialize the GUI application."""
         self.config_manager = config_manager
         self.sync_engine = None
         self.logger = logging.getLogger(__name__)
         
+        # Listing of logs/, reused until the folder's mtime changes
+        self._logs_dir_cache = {'mtime': None, 'files': None}
+        
+        # Widget/variable updates applied together on the next idle tick
+        self._pending_ui = {}
+        self._ui_apply_scheduled = False
+        
+        # Last dry-run state applied to the mode widgets
+        self._last_mode = None
+        
         # Create main window
         self.root = tk.Tk()
         self.root.title("Kobo-to-Calibre Sync Tool")
@@ -29,6 +185,25 @@ class KoboSyncGUI:
         # Create GUI components
         self._create_widgets()
         self._setup_logging_handler()
+        
+        # Single background worker for discovery/sync jobs
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+    
+    def _worker(self):
+        """Run queued background jobs one at a time; a None job stops the worker."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            
+            task, on_done, on_error = job
+            try:
+                result = task()
+                # Update GUI in main thread
+                self.root.after(0, on_done, result)
+            except Exception as e:
+                self.root.after(0, on_error, str(e))
     
     def _create_widgets(self):
         """Create and layout GUI widgets."""
@@ -42,15 +217,25 @@ class KoboSyncGUI:
         self.notebook.add(self.sync_frame, text="Sync")
         self._create_sync_tab()
         
-        # Configuration tab
+        # Configuration tab (built on first view)
         self.config_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.config_frame, text="Configuration")
-        self._create_config_tab()
         
-        # Logs tab
+        # Logs tab (built on first view)
         self.logs_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.logs_frame, text="Logs")
-        self._create_logs_tab()
+        
+        self._tab_builders = {
+            str(self.config_frame): self._create_config_tab,
+            str(self.logs_frame): self._create_logs_tab,
+        }
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_selected)
+    
+    def _on_tab_selected(self, event=None):
+        """Build a lazily created tab the first time it is shown."""
+        builder = self._tab_builders.pop(self.notebook.select(), None)
+        if builder:
+            builder()
     
     def _create_sync_tab(self):
         """Create the main sync interface."""
@@ -94,11 +279,13 @@ class KoboSyncGUI:
         self.progress_label = ttk.Label(progress_frame, textvariable=self.progress_var)
         self.progress_label.pack(pady=5)
         
-        self.progress_bar = ttk.Progressbar(progress_frame, mode='indeterminate')
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=100)
         self.progress_bar.pack(fill=tk.X, padx=10, pady=5)
         
         # Results text area
-        self.results_text = scrolledtext.ScrolledText(progress_frame, height=15)
+        # Read-only with no undo history; writes go through _editable()
+        self.results_text = scrolledtext.ScrolledText(progress_frame, height=15, undo=False, autoseparators=False,
+                                                      maxundo=0, state=tk.DISABLED)
         self.results_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
     
     def _create_config_tab(self):
@@ -121,8 +308,7 @@ class KoboSyncGUI:
         self.paths_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
         # Load current search paths
-        for path in self.config_manager.get_search_paths():
-            self.paths_listbox.insert(tk.END, path)
+        self.paths_listbox.insert(tk.END, *self.config_manager.get_search_paths())
     
     def _create_logs_tab(self):
         """Create logs display interface."""
@@ -154,70 +340,142 @@ class KoboSyncGUI:
                   command=self._clear_old_logs).pack(side=tk.LEFT, padx=5)
         
         # Log display
-        self.log_text = scrolledtext.ScrolledText(self.logs_frame)
+        self.log_text = scrolledtext.ScrolledText(self.logs_frame, undo=False, autoseparators=False,
+                                                  maxundo=0, state=tk.DISABLED)
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Catch up on scrolling skipped while the tab was hidden
+        self.log_text.bind('<Map>', lambda event: self.log_text.see(tk.END))
+        
+        # Show everything logged before the tab was first opened
+        self.gui_handler.attach(self.log_text)
+    
+    @staticmethod
+    def _trim(widget, max_lines: int):
+        """Drop the oldest lines so the text widget holds at most max_lines."""
+        excess = int(widget.index('end-1c').split('.')[0]) - max_lines
+        if excess > 0:
+            widget.delete('1.0', f'{excess + 1}.0')
     
     def _setup_logging_handler(self):
         """Setup custom logging handler to display logs in GUI."""
         
         class GUILogHandler(logging.Handler):
-            def __init__(self, text_widget):
+            """Queue records from any thread and flush them on the Tk thread."""
+            
+            FLUSH_INTERVAL_MS = 50
+            MAX_RECORDS_PER_FLUSH = 1000
+            
+            def __init__(self, root, max_lines):
                 super().__init__()
+                self.text_widget = None
+                self.root = root
+                self.max_lines = max_lines
+                self.queue = queue.SimpleQueue()
+                # Recent lines held until the Logs tab creates its text widget
+                self.pending = deque(maxlen=max_lines)
+                self.root.after(self.FLUSH_INTERVAL_MS, self._flush)
+            
+            def attach(self, text_widget):
                 self.text_widget = text_widget
+                if self.pending:
+                    self._write(''.join(self.pending))
+                    self.pending.clear()
+            
+            def _write(self, text):
+                with _editable(self.text_widget):
+                    self.text_widget.insert(tk.END, text)
+                    KoboSyncGUI._trim(self.text_widget, self.max_lines)
+                # One scroll per batch, and none while the Logs tab is hidden
+                if self.text_widget.winfo_ismapped():
+                    self.text_widget.see(tk.END)
             
             def emit(self, record):
-                msg = self.format(record)
-                self.text_widget.insert(tk.END, msg + '\n')
-                self.text_widget.see(tk.END)
+                try:
+                    self.queue.put_nowait(self.format(record) + '\n')
+                except Exception:
+                    self.handleError(record)
+            
+            def _flush(self):
+                lines = []
+                while len(lines) < self.MAX_RECORDS_PER_FLUSH:
+                    try:
+                        lines.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                if lines:
+                    if self.text_widget is None:
+                        self.pending.extend(lines)
+                    else:
+                        self._write(''.join(lines))
+                
+                self.root.after(self.FLUSH_INTERVAL_MS, self._flush)
         
-        gui_handler = GUILogHandler(self.log_text)
-        gui_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        self.gui_handler = GUILogHandler(self.root, self.LOG_MAX_LINES)
+        self.gui_handler.setFormatter(_CachedTimeFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
         
         # Add handler to root logger
-        logging.getLogger().addHandler(gui_handler)
+        logging.getLogger().addHandler(self.gui_handler)
     
     def _on_dry_run_toggle(self):
         """Handle dry run checkbox toggle."""
-        if self.dry_run_var.get():
+        dry_run = bool(self.dry_run_var.get())
+        if dry_run == self._last_mode:
+            return
+        self._last_mode = dry_run
+        
+        if dry_run:
             # Preview mode
-            self.sync_btn.config(text="🔍 START PREVIEW")
-            self.mode_status.config(text="📋 Preview mode - no files will be modified", foreground="orange")
+            self._queue_ui(self.sync_btn, text="🔍 START PREVIEW")
+            self._queue_ui(self.mode_status, text="📋 Preview mode - no files will be modified", foreground="orange")
         else:
             # Real sync mode
-            self.sync_btn.config(text="⚡ START REAL SYNC")
-            self.mode_status.config(text="⚠️ REAL SYNC - will modify Calibre libraries!", foreground="red")
+            self._queue_ui(self.sync_btn, text="⚡ START REAL SYNC")
+            self._queue_ui(self.mode_status, text="⚠️ REAL SYNC - will modify Calibre libraries!", foreground="red")
+    
+    def _queue_ui(self, target, **options):
+        """Queue a widget configure (or Variable value=) to be applied on the next idle tick."""
+        _, pending = self._pending_ui.setdefault(str(target), (target, {}))
+        pending.update(options)
+        if not self._ui_apply_scheduled:
+            self._ui_apply_scheduled = True
+            self.root.after_idle(self._apply_pending_ui)
+    
+    def _apply_pending_ui(self):
+        """Apply queued UI updates with one configure call per widget."""
+        pending, self._pending_ui = self._pending_ui, {}
+        self._ui_apply_scheduled = False
+        for target, options in pending.values():
+            if isinstance(target, tk.Variable):
+                target.set(options['value'])
+            else:
+                target.configure(**options)
     
     def _discover_libraries(self):
-        """Discover Calibre libraries in background thread."""
+        """Discover Calibre libraries on the background worker."""
         self.discover_btn.config(state=tk.DISABLED)
         self.progress_var.set("Discovering libraries...")
-        self.progress_bar.start()
+        self.progress_bar['value'] = 0
         
         def discovery_task():
-            try:
-                self.sync_engine = SyncEngine(self.config_manager)
-                libraries = self.sync_engine.discover_libraries()
-                
-                # Update GUI in main thread
-                self.root.after(0, self._on_discovery_complete, libraries)
-                
-            except Exception as e:
-                self.root.after(0, self._on_discovery_error, str(e))
+            self.sync_engine = SyncEngine(self.config_manager)
+            return self.sync_engine.discover_libraries()
         
-        threading.Thread(target=discovery_task, daemon=True).start()
+        self._jobs.put((discovery_task, self._on_discovery_complete, self._on_discovery_error))
     
     def _on_discovery_complete(self, libraries: List):
         """Handle library discovery completion."""
-        self.progress_bar.stop()
+        self.progress_bar['value'] = 100
         self.discover_btn.config(state=tk.NORMAL)
         
         if libraries:
-            status_text = f"Found {len(libraries)} libraries:\n"
-            for lib in libraries:
-                primary_indicator = " (PRIMARY)" if lib.is_primary else ""
-                status_text += f"  • {lib.name}{primary_indicator}\n"
+            parts = [f"Found {len(libraries)} libraries:\n"]
+            parts.extend(
+                f"  • {lib.name}{' (PRIMARY)' if lib.is_primary else ''}\n"
+                for lib in libraries
+            )
             
-            self.library_status.config(text=status_text)
+            self.library_status.config(text=''.join(parts))
             self.sync_btn.config(state=tk.NORMAL)
             self.progress_var.set("Ready to sync")
         else:
@@ -226,13 +484,13 @@ class KoboSyncGUI:
     
     def _on_discovery_error(self, error_msg: str):
         """Handle library discovery error."""
-        self.progress_bar.stop()
+        self.progress_bar['value'] = 0
         self.discover_btn.config(state=tk.NORMAL)
         self.progress_var.set("Discovery failed")
         messagebox.showerror("Discovery Error", f"Failed to discover libraries:\n{error_msg}")
     
     def _start_sync(self):
-        """Start sync process in background thread."""
+        """Start sync process on the background worker."""
         if not self.sync_engine:
             messagebox.showerror("Error", "Please discover libraries first")
             return
@@ -259,102 +517,118 @@ class KoboSyncGUI:
         else:
             self.progress_var.set("⚡ Running REAL SYNC - making changes to Calibre")
         
-        self.progress_bar.start()
-        self.results_text.delete(1.0, tk.END)
+        self.progress_bar['value'] = 0
+        with _editable(self.results_text):
+            self.results_text.delete(1.0, tk.END)
+        
+        def on_progress(percent: int):
+            # Called from the sync thread; hand the update to the Tk thread
+            self.root.after(0, lambda: self.progress_bar.configure(value=percent))
         
         def sync_task():
-            try:
-                results = self.sync_engine.run_sync(dry_run=dry_run)
-                self.root.after(0, self._on_sync_complete, results)
-            except Exception as e:
-                self.root.after(0, self._on_sync_error, str(e))
+            return self.sync_engine.run_sync(dry_run=dry_run, progress_callback=on_progress)
         
-        threading.Thread(target=sync_task, daemon=True).start()
+        self._jobs.put((sync_task, self._on_sync_complete, self._on_sync_error))
     
     
     def _on_sync_complete(self, results: Dict):
         """Handle sync completion."""
-        self.progress_bar.stop()
-        self.sync_btn.config(state=tk.NORMAL)
+        self.progress_bar['value'] = 100
+        self._queue_ui(self.sync_btn, state=tk.NORMAL)
         
-        is_dry_run = results.get('dry_run', False)
         conflicts_count = results.get('conflicts_count', 0)
         
-        # Check if conflicts need resolution
+        # Check if conflicts need resolution; results are shown once the user is done
         if conflicts_count > 0 and self.sync_engine:
             self.logger.info(f"Handling {conflicts_count} conflicts")
             conflicts = self.sync_engine.conflicts
-            resolved_matches = self._resolve_conflicts(conflicts)
+            self._resolve_conflicts(
+                conflicts,
+                lambda resolved_matches: self._on_conflicts_resolved(results, conflicts, conflicts_count, resolved_matches)
+            )
+        else:
+            self._show_sync_results(results, conflicts_count)
+    
+    def _on_conflicts_resolved(self, results: Dict, conflicts: List, conflicts_count: int, resolved_matches: List):
+        """Apply the user's conflict choices, then show the sync results."""
+        if resolved_matches:
+            # Apply resolved matches and update results
+            self.sync_engine.apply_conflict_resolutions(resolved_matches)
             
-            if resolved_matches:
-                # Apply resolved matches and update results
-                self.sync_engine.apply_conflict_resolutions(resolved_matches)
-                
-                # Update results to reflect resolved conflicts
-                results['total'] = results.get('total', 0) + len(resolved_matches)
-                results['conflicts_count'] = len(conflicts) - len(resolved_matches)
-                
-                self.logger.info(f"Resolved {len(resolved_matches)} conflicts")
+            # Update results to reflect resolved conflicts
+            results['total'] = results.get('total', 0) + len(resolved_matches)
+            results['conflicts_count'] = len(conflicts) - len(resolved_matches)
+            
+            self.logger.info(f"Resolved {len(resolved_matches)} conflicts")
+        
+        self._show_sync_results(results, conflicts_count)
+    
+    def _show_sync_results(self, results: Dict, conflicts_count: int):
+        """Display sync results and the completion message."""
+        is_dry_run = results.get('dry_run', False)
+        total = results.get('total', 0)
+        successful = results.get('successful', 0)
+        failed = results.get('failed', 0)
+        unmatched_count = results.get('unmatched_count', 0)
+        remaining_conflicts = results.get('conflicts_count', conflicts_count)
+        libs_updated = results.get('libraries_updated', [])
+        reports = results.get('reports') or {}
         
         if is_dry_run:
-            self.progress_var.set("🔍 Preview completed - no changes made")
+            self._queue_ui(self.progress_var, value="🔍 Preview completed - no changes made")
             header = "🔍 PREVIEW RESULTS (NO CHANGES MADE)\n"
-            self.results_text.config(bg="lightyellow")
+            self._queue_ui(self.results_text, bg="lightyellow")
         else:
-            self.progress_var.set("⚡ Real sync completed - changes made to Calibre!")
+            self._queue_ui(self.progress_var, value="⚡ Real sync completed - changes made to Calibre!")
             header = "⚡ REAL SYNC RESULTS (CHANGES MADE TO CALIBRE)\n"
-            self.results_text.config(bg="lightgreen")
+            self._queue_ui(self.results_text, bg="lightgreen")
         
         # Display results with clear formatting
-        self.results_text.insert(tk.END, header)
-        self.results_text.insert(tk.END, "=" * 60 + "\n\n")
+        parts = [header, "=" * 60 + "\n\n"]
         
         # Show key metrics
-        total = results.get('total', 0)
-        successful = results.get('successful', 0) 
-        failed = results.get('failed', 0)
-        
-        self.results_text.insert(tk.END, f"Books processed: {total}\n")
+        parts.append(f"Books processed: {total}\n")
         if is_dry_run:
-            self.results_text.insert(tk.END, f"Books ready to update: {successful}\n")
+            parts.append(f"Books ready to update: {successful}\n")
         else:
-            self.results_text.insert(tk.END, f"Successfully updated: {successful}\n")
-        self.results_text.insert(tk.END, f"Failed: {failed}\n")
-        self.results_text.insert(tk.END, f"Libraries affected: {len(results.get('libraries_updated', []))}\n")
-        self.results_text.insert(tk.END, f"Unmatched books: {results.get('unmatched_count', 0)}\n")
+            parts.append(f"Successfully updated: {successful}\n")
+        parts.append(f"Failed: {failed}\n")
+        parts.append(f"Libraries affected: {len(libs_updated)}\n")
+        parts.append(f"Unmatched books: {unmatched_count}\n")
         
         if conflicts_count > 0:
-            remaining_conflicts = results.get('conflicts_count', conflicts_count)
-            self.results_text.insert(tk.END, f"Conflicts resolved: {conflicts_count - remaining_conflicts}\n")
+            parts.append(f"Conflicts resolved: {conflicts_count - remaining_conflicts}\n")
             if remaining_conflicts > 0:
-                self.results_text.insert(tk.END, f"Conflicts remaining: {remaining_conflicts}\n")
-        self.results_text.insert(tk.END, "\n")
+                parts.append(f"Conflicts remaining: {remaining_conflicts}\n")
+        parts.append("\n")
         
         # Show unmatched books info
-        if 'reports' in results and 'unmatched_file' in results['reports']:
-            unmatched_file = results['reports']['unmatched_file']
-            if unmatched_file:
-                self.results_text.insert(tk.END, f"Unmatched books report saved to:\n{unmatched_file}\n\n")
+        unmatched_file = reports.get('unmatched_file')
+        if unmatched_file:
+            parts.append(f"Unmatched books report saved to:\n{unmatched_file}\n\n")
         
         # Show unmatched summary
-        if 'reports' in results and 'unmatched' in results['reports']:
-            self.results_text.insert(tk.END, results['reports']['unmatched'])
+        if 'unmatched' in reports:
+            parts.append(reports['unmatched'])
+        
+        with _editable(self.results_text):
+            self.results_text.insert(tk.END, ''.join(parts))
+            self._trim(self.results_text, self.RESULTS_MAX_LINES)
         
         # Show completion message
         if is_dry_run:
             if total > 0:
                 conflict_msg = ""
                 if conflicts_count > 0:
-                    resolved_count = conflicts_count - results.get('conflicts_count', 0)
-                    conflict_msg = f"\nConflicts resolved: {resolved_count}"
-                    if results.get('conflicts_count', 0) > 0:
-                        conflict_msg += f"\nConflicts remaining: {results.get('conflicts_count', 0)}"
+                    conflict_msg = f"\nConflicts resolved: {conflicts_count - remaining_conflicts}"
+                    if remaining_conflicts > 0:
+                        conflict_msg += f"\nConflicts remaining: {remaining_conflicts}"
                 
                 messagebox.showinfo(
                     "🔍 Preview Complete", 
                     f"Preview completed successfully!\n\n"
                     f"Found {total} books ready to update.\n"
-                    f"Unmatched: {results.get('unmatched_count', 0)} books{conflict_msg}\n\n"
+                    f"Unmatched: {unmatched_count} books{conflict_msg}\n\n"
                     f"Uncheck 'DRY RUN' and click sync button to make actual changes."
                 )
             else:
@@ -378,163 +652,141 @@ class KoboSyncGUI:
     
     def _on_sync_error(self, error_msg: str):
         """Handle sync error."""
-        self.progress_bar.stop()
-        self.sync_btn.config(state=tk.NORMAL)
-        self.progress_var.set("Sync failed")
+        self.progress_bar['value'] = 0
+        self._queue_ui(self.sync_btn, state=tk.NORMAL)
+        self._queue_ui(self.progress_var, value="Sync failed")
         messagebox.showerror("Sync Error", f"Sync failed:\n{error_msg}")
     
-    def _resolve_conflicts(self, conflicts: List) -> List:
-        """Resolve conflicts through user dialog."""
+    def _resolve_conflicts(self, conflicts: List, on_done: Callable[[List], None]):
+        """
+        Resolve conflicts through user dialog.
+        
+        Conflicts are shown one at a time without blocking the event loop;
+        on_done receives the resolved matches once the last one is answered.
+        """
         if not conflicts:
-            return []
+            on_done([])
+            return
         
-        resolved_matches = []
+        self._conflict_iter = iter(conflicts)
+        self._current_conflict = None
+        self._resolved_matches = []
+        self._conflicts_done = on_done
+        self._conflict_dialog = _ConflictDialog(self.root, self._on_conflict_choice)
+        self._show_next_conflict()
+    
+    def _show_next_conflict(self):
+        """Show the next pending conflict, or finish when there are none left."""
+        conflict = next(self._conflict_iter, None)
+        if conflict is None:
+            self._finish_conflicts()
+            return
         
-        for conflict in conflicts:
-            # Create conflict resolution dialog
-            dialog = tk.Toplevel(self.root)
-            dialog.title("Resolve Conflict")
-            dialog.geometry("600x400")
-            dialog.transient(self.root)
-            dialog.grab_set()
-            
-            # Center the dialog
-            dialog.update_idletasks()
-            x = (dialog.winfo_screenwidth() // 2) - (600 // 2)
-            y = (dialog.winfo_screenheight() // 2) - (400 // 2)
-            dialog.geometry(f"600x400+{x}+{y}")
-            
-            # Book info
-            book_frame = ttk.LabelFrame(dialog, text="Book Information")
-            book_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            ttk.Label(book_frame, text=f"Title: {conflict.kobo_book.title}", font=("TkDefaultFont", 10, "bold")).pack(anchor=tk.W, padx=10, pady=2)
-            ttk.Label(book_frame, text=f"Author: {conflict.kobo_book.author}").pack(anchor=tk.W, padx=10, pady=2)
-            ttk.Label(book_frame, text=f"Collections: {', '.join(conflict.kobo_book.collections[:5])}").pack(anchor=tk.W, padx=10, pady=2)
-            
-            # Conflict info
-            conflict_frame = ttk.LabelFrame(dialog, text="Found in Multiple Libraries")
-            conflict_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
-            
-            ttk.Label(conflict_frame, text="This book was found in the following libraries:").pack(anchor=tk.W, padx=10, pady=5)
-            
-            # Resolution options
-            resolution_var = tk.StringVar(value="")
-            
-            for i, match in enumerate(conflict.matches):
-                frame = ttk.Frame(conflict_frame)
-                frame.pack(fill=tk.X, padx=10, pady=2)
-                
-                ttk.Radiobutton(
-                    frame, 
-                    text=f"Update in {match.library.name} library",
-                    variable=resolution_var,
-                    value=f"library_{i}"
-                ).pack(anchor=tk.W)
-            
-            # All libraries option
-            ttk.Radiobutton(
-                conflict_frame,
-                text="Update in ALL libraries",
-                variable=resolution_var,
-                value="all"
-            ).pack(anchor=tk.W, padx=10, pady=2)
-            
-            # Skip option
-            ttk.Radiobutton(
-                conflict_frame,
-                text="Skip this book (don't update anywhere)",
-                variable=resolution_var,
-                value="skip"
-            ).pack(anchor=tk.W, padx=10, pady=2)
-            
-            # Dialog result
-            result = {"action": None}
-            
-            def on_ok():
-                result["action"] = resolution_var.get()
-                dialog.destroy()
-            
-            def on_skip_all():
-                result["action"] = "skip_all"
-                dialog.destroy()
-            
-            # Buttons
-            button_frame = ttk.Frame(dialog)
-            button_frame.pack(fill=tk.X, padx=10, pady=10)
-            
-            ttk.Button(button_frame, text="OK", command=on_ok).pack(side=tk.RIGHT, padx=5)
-            ttk.Button(button_frame, text="Skip All Conflicts", command=on_skip_all).pack(side=tk.RIGHT, padx=5)
-            
-            # Wait for user response
-            dialog.wait_window()
-            
-            # Process result
-            action = result["action"]
-            
-            if action == "skip_all":
-                break
-            elif action == "skip" or not action:
-                continue
-            elif action == "all":
-                resolved_matches.extend(conflict.matches)
-            elif action.startswith("library_"):
-                library_index = int(action.split("_")[1])
-                resolved_matches.append(conflict.matches[library_index])
+        self._current_conflict = conflict
+        self._conflict_dialog.show(conflict)
+    
+    def _on_conflict_choice(self, action: Optional[str]):
+        """Record the user's choice for the current conflict."""
+        conflict = self._current_conflict
         
-        return resolved_matches
+        if action == "skip_all":
+            self._finish_conflicts()
+            return
+        elif action == "all":
+            self._resolved_matches.extend(conflict.matches)
+        elif action and action.startswith("library_"):
+            library_index = int(action.split("_")[1])
+            self._resolved_matches.append(conflict.matches[library_index])
+        # "skip" or no selection: leave this book out
+        
+        self.root.after(0, self._show_next_conflict)
+    
+    def _finish_conflicts(self):
+        """Tear down the conflict dialog and hand back the resolved matches."""
+        self._conflict_dialog.destroy()
+        resolved_matches, on_done = self._resolved_matches, self._conflicts_done
+        
+        self._conflict_dialog = None
+        self._conflict_iter = None
+        self._current_conflict = None
+        self._resolved_matches = []
+        self._conflicts_done = None
+        
+        on_done(resolved_matches)
     
     def _clear_logs(self):
         """Clear the log display."""
-        self.log_text.delete(1.0, tk.END)
+        self.gui_handler.pending.clear()
+        if self.gui_handler.text_widget is not None:
+            with _editable(self.log_text):
+                self.log_text.delete(1.0, tk.END)
     
     def run(self):
         """Start the GUI application."""
         self.logger.info("Starting Kobo-to-Calibre Sync GUI")
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self._jobs.put(None)
+    
+    @staticmethod
+    def _spawn_opener(path: str):
+        """Open a file or folder with the system default app, without waiting for it."""
+        if sys.platform == "win32":
+            os.startfile(path)
+        else:
+            opener = "open" if sys.platform == "darwin" else "xdg-open"
+            subprocess.Popen([opener, path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
     def _open_logs_folder(self):
         """Open the logs folder in file manager."""
-        import subprocess
-        import os
-        from pathlib import Path
-        
         logs_path = Path("logs")
         if logs_path.exists():
             try:
-                # macOS
-                subprocess.run(["open", str(logs_path)])
+                self._spawn_opener(str(logs_path))
                 self.logger.info(f"📂 Opened logs folder: {logs_path.absolute()}")
             except Exception as e:
                 self.logger.error(f"Failed to open logs folder: {e}")
         else:
             messagebox.showwarning("Logs Folder", "Logs folder does not exist yet.")
     
+    def _list_log_files(self, logs_path) -> List:
+        """List files in the logs folder, newest first, cached until the folder changes."""
+        dir_mtime = logs_path.stat().st_mtime_ns
+        cache = self._logs_dir_cache
+        if cache['mtime'] != dir_mtime:
+            # DirEntry caches its stat result, so each file is stat'ed once
+            with os.scandir(logs_path) as it:
+                files = [entry for entry in it if entry.is_file()]
+            files.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+            cache['mtime'] = dir_mtime
+            cache['files'] = files
+        return cache['files']
+    
+    @staticmethod
+    def _is_unmatched_report(name: str) -> bool:
+        return name.startswith(UNMATCHED_REPORT_PREFIX) and name.endswith(UNMATCHED_REPORT_SUFFIX)
+    
     def _open_unmatched_report(self):
         """Open the most recent unmatched books report."""
-        import subprocess
-        from pathlib import Path
-        import glob
-        
         logs_path = Path("logs")
         if not logs_path.exists():
             messagebox.showwarning("No Reports", "No logs folder found.")
             return
         
-        # Find most recent unmatched books report
-        pattern = str(logs_path / "unmatched_books_*.txt")
-        reports = glob.glob(pattern)
+        # Find unmatched books reports (newest first)
+        reports = [e for e in self._list_log_files(logs_path) if self._is_unmatched_report(e.name)]
         
         if not reports:
             messagebox.showinfo("No Reports", "No unmatched books reports found.")
             return
         
         # Get most recent report
-        latest_report = max(reports, key=os.path.getctime)
+        latest_report = reports[0].path
         
         try:
             # Open with default text editor
-            subprocess.run(["open", latest_report])
+            self._spawn_opener(latest_report)
             self.logger.info(f"📄 Opened unmatched report: {latest_report}")
         except Exception as e:
             self.logger.error(f"Failed to open unmatched report: {e}")
@@ -543,10 +795,6 @@ class KoboSyncGUI:
     def _rotate_logs(self):
         """Rotate current logs (archive old ones)."""
         try:
-            from pathlib import Path
-            import shutil
-            from datetime import datetime
-            
             logs_path = Path("logs")
             if not logs_path.exists():
                 messagebox.showinfo("No Logs", "No logs to rotate.")
@@ -573,27 +821,23 @@ class KoboSyncGUI:
     def _clear_old_logs(self):
         """Clear old log files (keep recent ones)."""
         try:
-            from pathlib import Path
-            import glob
-            import os
-            
             logs_path = Path("logs")
             if not logs_path.exists():
                 messagebox.showinfo("No Logs", "No logs folder found.")
                 return
             
-            # Get all log files
-            log_files = []
-            for pattern in ["*.log", "unmatched_books_*.txt"]:
-                log_files.extend(glob.glob(str(logs_path / pattern)))
+            # Get all log files (newest first)
+            log_files = [
+                e for e in self._list_log_files(logs_path)
+                if e.name.endswith(".log") or self._is_unmatched_report(e.name)
+            ]
             
             if len(log_files) <= 5:  # Keep at least 5 recent files
                 messagebox.showinfo("Keep Logs", f"Only {len(log_files)} log files found. Keeping all recent logs.")
                 return
             
-            # Sort by modification time, keep newest 5
-            log_files.sort(key=os.path.getmtime, reverse=True)
-            files_to_delete = log_files[5:]  # Delete older files
+            # Keep newest 5
+            files_to_delete = [e.path for e in log_files[5:]]  # Delete older files
             
             # Confirm deletion
             response = messagebox.askyesno(
@@ -603,17 +847,28 @@ class KoboSyncGUI:
             )
             
             if response:
-                deleted_count = 0
-                for file_path in files_to_delete:
+                def remove_file(file_path: str) -> bool:
                     try:
                         os.remove(file_path)
-                        deleted_count += 1
+                        return True
                     except Exception as e:
                         self.logger.warning(f"Could not delete {file_path}: {e}")
+                        return False
+                
+                def delete_task():
+                    with ThreadPoolExecutor(max_workers=8) as executor:
+                        deleted_count = sum(executor.map(remove_file, files_to_delete))
+                    
+                    # Update GUI in main thread
+                    self.root.after(0, self._on_old_logs_cleared, deleted_count)
                 
-                self.logger.info(f"🗑️ Deleted {deleted_count} old log files")
-                messagebox.showinfo("Cleanup Complete", f"Deleted {deleted_count} old log files.")
+                threading.Thread(target=delete_task, daemon=True).start()
                 
         except Exception as e:
             self.logger.error(f"Failed to clear old logs: {e}")
-            messagebox.showerror("Error", f"Failed to clear logs: {e}")
\ No newline at end of file
+            messagebox.showerror("Error", f"Failed to clear logs: {e}")
+    
+    def _on_old_logs_cleared(self, deleted_count: int):
+        """Handle completion of old log cleanup."""
+        self.logger.info(f"🗑️ Deleted {deleted_count} old log files")
+        messagebox.showinfo("Cleanup Complete", f"Deleted {deleted_count} old log files.")
\ No newline at end of file
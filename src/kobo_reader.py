@@ -4,12 +4,31 @@ Kobo Reader - Extract collections and reading data from KoboReader.sqlite
 
 import sqlite3
 import logging
+import hashlib
+import pickle
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
 
-@dataclass
+# Read-side tuning for the shared connection; the Kobo database is never written
+_READ_PRAGMAS = """
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -64000;
+    PRAGMA mmap_size = 268435456;
+"""
+
+# Rows pulled from the book query per fetchmany() call
+_FETCH_BATCH_SIZE = 1000
+
+# Pickled book lists from previous reads, reused while the Kobo database is unchanged
+_BOOKS_CACHE_DIR = Path("cache")
+# Bumped whenever the cached book format changes, so existing caches are rebuilt
+_BOOKS_CACHE_VERSION = 1
+
+
+@dataclass(slots=True)
 class KoboBook:
     """Represents a book from the Kobo database."""
     content_id: str
@@ -18,10 +37,13 @@ class KoboBook:
     read_status: int
     percent_read: int
     date_last_read: Optional[str]
-    collections: List[str]
+    collections: Tuple[str, ...]
+    # collections split into rating and genre display names when the book is read
+    rating_collections: Tuple[str, ...] = ()
+    genre_collections: Tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class KoboCollection:
     """Represents a collection/shelf from the Kobo database."""
     name: str
@@ -45,114 +67,257 @@ class KoboReader:
             "| favorite": "Favorites",
             "| good": "Great"
         }
+        # Interned so the interned names read from the database are these same
+        # objects, and membership tests end on an identity check
+        self.rating_collections = {sys.intern(k): sys.intern(v) for k, v in self.rating_collections.items()}
+        self.rating_collection_keys = frozenset(self.rating_collections)
+        self.rating_display_values = frozenset(self.rating_collections.values())
+        
+        # Books from the last get_books_with_collections() call, by ContentID
+        self.books_by_id: Dict[str, KoboBook] = {}
+        
+        # Shared connection, opened on first use by _get_conn()
+        self._conn: Optional[sqlite3.Connection] = None
     
     def connect(self) -> sqlite3.Connection:
         """Create connection to Kobo database."""
         if not self.db_path.exists():
             raise FileNotFoundError(f"Kobo database not found: {self.db_path}")
         
-        conn = sqlite3.connect(self.db_path)
+        # Read-only, and immutable when that is safe: the tool never writes the
+        # database, so SQLite can skip locking and journal handling entirely.
+        # immutable=1 makes SQLite ignore the -wal file, so a database with
+        # committed changes still in its WAL is opened plain read-only instead.
+        db_uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        wal_state = self._wal_state()
+        if wal_state is None or wal_state[1] == 0:
+            db_uri += "&immutable=1"
+        conn = sqlite3.connect(db_uri, uri=True)
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         return conn
     
+    def _wal_state(self) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of the database's -wal file, or None if there is none."""
+        try:
+            stat = self.db_path.with_name(self.db_path.name + "-wal").stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _get_conn(self) -> sqlite3.Connection:
+        """Get the shared connection, opening and tuning it on first use."""
+        if self._conn is None:
+            conn = self.connect()
+            conn.executescript(_READ_PRAGMAS)
+            self._conn = conn
+        return self._conn
+    
+    def close(self):
+        """Close the shared connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
     def get_collections(self) -> List[KoboCollection]:
         """Extract all active collections from Kobo database."""
         collections = []
         
-        with self.connect() as conn:
-            cursor = conn.execute("""
-                SELECT Name, InternalName, Type
-                FROM Shelf 
-                WHERE _IsDeleted = 'false' AND _IsVisible = 'true'
-                ORDER BY Name
-            """)
+        conn = self._get_conn()
+        cursor = conn.execute("""
+            SELECT Name, InternalName, Type
+            FROM Shelf 
+            WHERE _IsDeleted = 'false' AND _IsVisible = 'true'
+            ORDER BY Name
+        """)
+        
+        for row in cursor:
+            name = sys.intern(row['Name'])
+            is_rating = name in self.rating_collection_keys
             
-            for row in cursor:
-                name = row['Name']
-                is_rating = name in self.rating_collections
-                
-                collection = KoboCollection(
-                    name=name,
-                    internal_name=row['InternalName'],
-                    collection_type=row['Type'],
-                    is_rating=is_rating
-                )
-                collections.append(collection)
+            collection = KoboCollection(
+                name=name,
+                internal_name=row['InternalName'],
+                collection_type=row['Type'],
+                is_rating=is_rating
+            )
+            collections.append(collection)
         
         self.logger.info(f"Found {len(collections)} collections")
         return collections
     
+    def _display_name_sql(self) -> Tuple[str, List[str]]:
+        """
+        Build a CASE expression mapping Shelf s.Name to its display name.
+        
+        Returns the SQL fragment and its parameters, taken from self.rating_collections.
+        """
+        display_case = "CASE s.Name {} ELSE s.Name END".format(
+            " ".join("WHEN ? THEN ?" for _ in self.rating_collections)
+        )
+        params = [value for item in self.rating_collections.items() for value in item]
+        return display_case, params
+    
+    def get_collection_stats(self) -> Dict:
+        """
+        Count the collections in use by books, computed in SQL.
+        
+        Returns:
+            Dict with 'unique' (number of distinct collection display names) and
+            'rating_used' (set of rating display names used by at least one book)
+        """
+        display_case, params = self._display_name_sql()
+        cursor = self._get_conn().execute(f"""
+            SELECT DISTINCT {display_case}
+            FROM content c
+            JOIN ShelfContent sc
+                ON sc.ContentId = c.ContentID AND sc._IsDeleted = 'false'
+            JOIN Shelf s
+                ON s.Name = sc.ShelfName AND s._IsDeleted = 'false'
+            WHERE c.ContentType = 6  -- Books only
+        """, params)
+        
+        names = {row[0] for row in cursor}
+        return {
+            'unique': len(names),
+            'rating_used': names & self.rating_display_values
+        }
+    
+    def _books_cache_key(self) -> Tuple:
+        """
+        Identify the cache format, the current database contents and the rating
+        mapping applied to them.
+        
+        Includes the -wal file's state, since writes to a WAL-mode database
+        leave the main file untouched until a checkpoint.
+        """
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Kobo database not found: {self.db_path}")
+        
+        resolved = self.db_path.resolve()
+        stat = resolved.stat()
+        return (_BOOKS_CACHE_VERSION, str(resolved), stat.st_mtime_ns, stat.st_size,
+                self._wal_state(), tuple(self.rating_collections.items()))
+    
+    def _books_cache_path(self) -> Path:
+        """Cache file for this database's book list, unique per database location."""
+        digest = hashlib.sha1(str(self.db_path.resolve()).encode('utf-8')).hexdigest()[:12]
+        return _BOOKS_CACHE_DIR / f"kobo_books_{digest}.pkl"
+    
+    def _load_cached_books(self, cache_key: Tuple) -> Optional[List[KoboBook]]:
+        """Return the cached book list if it was built from the same database contents."""
+        try:
+            with open(self._books_cache_path(), 'rb') as f:
+                cached_key, books = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable Kobo book cache: {e}")
+            return None
+        
+        return books if cached_key == cache_key else None
+    
+    def _save_cached_books(self, cache_key: Tuple, books: List[KoboBook]):
+        """Write the book list to the cache; failures only cost the next read."""
+        try:
+            _BOOKS_CACHE_DIR.mkdir(exist_ok=True)
+            with open(self._books_cache_path(), 'wb') as f:
+                pickle.dump((cache_key, books), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            self.logger.warning(f"Could not write Kobo book cache: {e}")
+    
     def get_books_with_collections(self) -> List[KoboBook]:
-        """Extract all books with their collection memberships."""
+        """
+        Extract all books with their collection memberships.
+        
+        The result is cached on disk and reused, without querying the database,
+        until the database or its -wal file changes (modification time or size),
+        the rating mapping changes, or the cache format version is bumped.
+        """
+        cache_key = self._books_cache_key()
+        books = self._load_cached_books(cache_key)
+        if books is not None:
+            self.books_by_id = {book.content_id: book for book in books}
+            self.logger.info(f"Found {len(books)} books (cached)")
+            return books
+        
+        books = self._query_books()
+        self._save_cached_books(cache_key, books)
+        
+        self.books_by_id = {book.content_id: book for book in books}
+        
+        self.logger.info(f"Found {len(books)} books")
+        return books
+    
+    def _query_books(self) -> List[KoboBook]:
+        """Read all books and their collection display names from the database."""
         books = []
         
-        with self.connect() as conn:
-            # Get all books with basic info
-            cursor = conn.execute("""
-                SELECT 
-                    ContentID, 
-                    Title, 
-                    Attribution, 
-                    ReadStatus, 
-                    ___PercentRead,
-                    DateLastRead
-                FROM content 
-                WHERE ContentType = 6  -- Books only
-                ORDER BY Title
-            """)
-            
-            book_data = {row['ContentID']: row for row in cursor}
-            
-            # Get collection memberships
-            cursor = conn.execute("""
-                SELECT sc.ContentId, s.Name as ShelfName
-                FROM ShelfContent sc
-                JOIN Shelf s ON sc.ShelfName = s.Name
-                WHERE sc._IsDeleted = 'false' AND s._IsDeleted = 'false'
-                ORDER BY sc.ContentId, s.Name
-            """)
-            
-            # Group collections by book
-            book_collections = {}
-            for row in cursor:
-                content_id = row['ContentId']
-                shelf_name = row['ShelfName']
-                
-                if content_id not in book_collections:
-                    book_collections[content_id] = []
-                book_collections[content_id].append(shelf_name)
-            
-            # Create KoboBook objects
-            for content_id, book_info in book_data.items():
-                raw_collections = book_collections.get(content_id, [])
-                # Convert rating collections to display names
-                converted_collections = self._convert_collections(raw_collections)
+        conn = self._get_conn()
+        display_case, params = self._display_name_sql()
+        
+        # Books with their collection memberships in one pass; books without
+        # collections come back once with a NULL DisplayName.
+        # No indexes are created here (the Kobo database is treated as
+        # read-only): SQLite builds an automatic covering index on
+        # ShelfContent(ContentId, _IsDeleted) for the join, and the Shelf side
+        # uses the device's own shelf_name_index.
+        # Plain tuples here: this is the high-volume query, and positional access
+        # skips sqlite3.Row's by-name column lookup
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(f"""
+            SELECT 
+                c.ContentID, 
+                c.Title, 
+                c.Attribution, 
+                c.ReadStatus, 
+                c.___PercentRead,
+                c.DateLastRead,
+                {display_case} AS DisplayName
+            FROM content c
+            LEFT JOIN ShelfContent sc
+                ON sc.ContentId = c.ContentID AND sc._IsDeleted = 'false'
+            LEFT JOIN Shelf s
+                ON s.Name = sc.ShelfName AND s._IsDeleted = 'false'
+            WHERE c.ContentType = 6  -- Books only
+            ORDER BY c.Title, c.ContentID, s.Name
+        """, params)
+        
+        # Rows arrive grouped by book; emit a KoboBook when ContentID changes
+        book_row = None
+        collections = []
+        while batch := cursor.fetchmany(_FETCH_BATCH_SIZE):
+            for row in batch:
+                if book_row is not None and row[0] != book_row[0]:
+                    books.append(self._make_book(book_row, collections))
+                    collections = []
                 
-                book = KoboBook(
-                    content_id=content_id,
-                    title=book_info['Title'] or "",
-                    author=book_info['Attribution'] or "",
-                    read_status=book_info['ReadStatus'] or 0,
-                    percent_read=book_info['___PercentRead'] or 0,
-                    date_last_read=book_info['DateLastRead'],
-                    collections=converted_collections
-                )
-                books.append(book)
+                book_row = row
+                display_name = row[6]
+                if display_name is not None:
+                    # Interned so every book shares one string per collection name
+                    collections.append(sys.intern(display_name))
+        
+        if book_row is not None:
+            books.append(self._make_book(book_row, collections))
         
-        self.logger.info(f"Found {len(books)} books")
         return books
     
-    def _convert_collections(self, raw_collections: List[str]) -> List[str]:
-        """Convert collections from database format to display format."""
-        converted = []
-        for collection in raw_collections:
-            # Convert rating collections to display names
-            if collection in self.rating_collections:
-                converted.append(self.rating_collections[collection])
-            else:
-                # Keep non-rating collections as-is
-                converted.append(collection)
-        return converted
+    def _make_book(self, row: tuple, collections: List[str]) -> KoboBook:
+        """Build a KoboBook from its content row and collection display names."""
+        content_id, title, author, read_status, percent_read, date_last_read, _ = row
+        ratings = self.rating_display_values
+        return KoboBook(
+            content_id=content_id,
+            title=title or "",
+            author=author or "",
+            read_status=read_status or 0,
+            percent_read=percent_read or 0,
+            date_last_read=date_last_read,
+            collections=tuple(collections),
+            rating_collections=tuple(c for c in collections if c in ratings),
+            genre_collections=tuple(c for c in collections if c not in ratings)
+        )
     
     def get_rating_collections(self) -> List[str]:
         """Get list of collections that represent ratings."""
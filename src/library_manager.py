@@ -5,9 +5,39 @@ Library Manager - Discover and manage multiple Calibre libraries
 import os
 import sqlite3
 import logging
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict, Tuple
 from dataclasses import dataclass
+from functools import cached_property
+
+
+# Library discovery: how deep below each search path to look, and directories never worth entering
+_MAX_SEARCH_DEPTH = 4
+_SKIP_DIR_NAMES = frozenset({'node_modules', 'backup', 'temp', 'Library', '__pycache__'})
+
+
+# Validity probe for a Calibre metadata.db
+_BOOKS_TABLE_CHECK_SQL = "SELECT 1 FROM sqlite_master WHERE type='table' AND name='books' LIMIT 1"
+
+
+# SQLite's default cap on databases attached to one connection
+_MAX_ATTACHED = 10
+
+
+def _connect_read_only(metadata_db: Path) -> sqlite3.Connection:
+    """Open a Calibre metadata.db read-only (no journal or write locks)."""
+    return sqlite3.connect(f"{metadata_db.resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _make_library_info(book_count: int, custom_columns: Dict[str, str]) -> Dict:
+    """Build the get_library_info result from a library's book count and custom columns."""
+    return {
+        'book_count': book_count,
+        'custom_columns': custom_columns,
+        'has_my_ratings': 'myratings' in custom_columns or '#my_ratings' in custom_columns,
+        'has_my_genres': 'my_genres' in custom_columns or '#my_genres' in custom_columns
+    }
 
 
 @dataclass
@@ -17,6 +47,16 @@ class CalibreLibrary:
     path: Path
     metadata_db_path: Path
     is_primary: bool = False  # MCR library will be primary
+    
+    @cached_property
+    def path_str(self) -> str:
+        """Library path as a string, converted once for building calibredb commands."""
+        return str(self.path)
+    
+    @cached_property
+    def lower_name(self) -> str:
+        """Library name lowercased once, for case-insensitive lookups."""
+        return self.name.lower()
 
 
 class LibraryManager:
@@ -27,6 +67,12 @@ class LibraryManager:
         self.logger = logging.getLogger(__name__)
         self.libraries: List[CalibreLibrary] = []
         self.primary_library: Optional[CalibreLibrary] = None
+        # When set, books missing from the primary library are not searched for elsewhere
+        self.strict_primary_only = False
+        # Libraries keyed by lowercased name for get_library_by_name
+        self._by_lower_name: Dict[str, CalibreLibrary] = {}
+        # get_library_info results keyed by (resolved metadata.db path, st_mtime_ns)
+        self._info_cache: Dict[Tuple[str, int], Dict] = {}
     
     def discover_libraries(self, search_paths: List[str] = None) -> List[CalibreLibrary]:
         """
@@ -53,7 +99,7 @@ class LibraryManager:
                 continue
             
             # Search for metadata.db files
-            for metadata_file in path.rglob("metadata.db"):
+            for metadata_file in self._find_metadata_dbs(path):
                 library_path = metadata_file.parent.resolve()  # Resolve to absolute path
                 library_name = library_path.name
                 
@@ -77,16 +123,50 @@ class LibraryManager:
                     self.logger.info(f"Found Calibre library: {library_name} at {library_path}")
         
         # Set MCR library as primary if found
-        for library in libraries:
-            if "mcr" in library.name.lower():
-                library.is_primary = True
-                self.primary_library = library
-                self.logger.info(f"Set {library.name} as primary library")
-                break
+        primary = next((library for library in libraries if "mcr" in library.lower_name), None)
+        if primary is not None:
+            primary.is_primary = True
+            self.primary_library = primary
+            self.logger.info(f"Set {primary.name} as primary library")
         
         self.libraries = libraries
+        self._by_lower_name = {}
+        for library in libraries:
+            # First library wins on a case-insensitive name clash, as with a linear scan
+            self._by_lower_name.setdefault(library.lower_name, library)
         return libraries
     
+    def _find_metadata_dbs(self, root: Path) -> Iterator[Path]:
+        """
+        Breadth-first search for metadata.db files below root.
+        
+        Stops descending once a directory holds a metadata.db (Calibre libraries
+        don't nest), limits depth to _MAX_SEARCH_DEPTH and skips hidden folders.
+        """
+        pending = deque([(root, 0)])
+        
+        while pending:
+            directory, depth = pending.popleft()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            
+            if any(entry.name == "metadata.db" and entry.is_file() for entry in entries):
+                yield Path(directory) / "metadata.db"
+                continue
+            
+            if depth >= _MAX_SEARCH_DEPTH:
+                continue
+            
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.') or name in _SKIP_DIR_NAMES:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, depth + 1))
+    
     def _is_valid_calibre_library(self, library_path: Path) -> bool:
         """Check if a directory contains a valid Calibre library."""
         metadata_db = library_path / "metadata.db"
@@ -95,31 +175,109 @@ class LibraryManager:
             return False
         
         try:
-            # Try to connect and check for expected tables
-            conn = sqlite3.connect(metadata_db)
+            conn = _connect_read_only(metadata_db)
+            try:
+                # Should have at least books table
+                return conn.execute(_BOOKS_TABLE_CHECK_SQL).fetchone() is not None
+            finally:
+                conn.close()
+            
+        except sqlite3.Error:
+            return False
+    
+    def _read_library_info(self, metadata_db: Path) -> Dict:
+        """
+        Read the book count and custom columns of a metadata.db.
+        
+        Results are cached until the file's mtime changes; sqlite3 errors
+        propagate uncached.
+        """
+        cache_key = self._info_cache_key(metadata_db)
+        if cache_key in self._info_cache:
+            return self._info_cache[cache_key]
+        
+        conn = _connect_read_only(metadata_db)
+        try:
             cursor = conn.cursor()
+            # One read transaction (one shared lock) for both queries
+            cursor.execute("BEGIN")
             
-            # Check for key Calibre tables
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name IN ('books', 'authors', 'custom_columns')
-            """)
+            # Exact book count; COUNT(*) walks the smallest b-tree without
+            # decoding rows, and the result is cached per mtime above
+            cursor.execute("SELECT COUNT(*) FROM books")
+            book_count = cursor.fetchone()[0]
             
-            tables = [row[0] for row in cursor.fetchall()]
+            # Get custom columns
+            cursor.execute("SELECT label, name FROM custom_columns")
+            custom_columns = {row[0]: row[1] for row in cursor.fetchall()}
+        finally:
             conn.close()
-            
-            # Should have at least books table
-            return 'books' in tables
-            
+        
+        info = _make_library_info(book_count, custom_columns)
+        self._info_cache[cache_key] = info
+        return info
+    
+    def _info_cache_key(self, metadata_db: Path) -> Tuple[str, int]:
+        """Key a metadata.db's cached info by its resolved path and modification time."""
+        return (str(metadata_db.resolve()), metadata_db.stat().st_mtime_ns)
+    
+    @staticmethod
+    def federated_schema(library: CalibreLibrary) -> str:
+        """Quoted schema name ("lib_<name>") a library is attached under by open_federated()."""
+        return '"lib_{}"'.format(library.name.replace('"', '""'))
+    
+    def open_federated(self, libraries: Optional[List[CalibreLibrary]] = None) -> sqlite3.Connection:
+        """
+        Open one read-only connection with each library's metadata.db attached.
+        
+        Each library is attached under federated_schema(library), so queries can
+        span libraries with UNION ALL in a single statement. SQLite allows at most
+        _MAX_ATTACHED attachments per connection; attaching more raises sqlite3.Error.
+        The caller closes the connection.
+        """
+        if libraries is None:
+            libraries = self.libraries
+        
+        conn = sqlite3.connect("file::memory:", uri=True)
+        try:
+            for library in libraries:
+                library_uri = f"{library.metadata_db_path.resolve().as_uri()}?mode=ro"
+                conn.execute(f"ATTACH DATABASE ? AS {self.federated_schema(library)}", (library_uri,))
         except sqlite3.Error:
-            return False
+            conn.close()
+            raise
+        return conn
+    
+    def _read_federated_info(self, libraries: List[CalibreLibrary]) -> Dict[str, Dict]:
+        """
+        Read book counts and custom columns for up to _MAX_ATTACHED libraries,
+        one UNION ALL query each over a federated connection.
+        """
+        count_sql = " UNION ALL ".join(
+            f"SELECT ?, COUNT(*) FROM {self.federated_schema(lib)}.books" for lib in libraries
+        )
+        columns_sql = " UNION ALL ".join(
+            f"SELECT ?, label, name FROM {self.federated_schema(lib)}.custom_columns" for lib in libraries
+        )
+        names = [lib.name for lib in libraries]
+        
+        conn = self.open_federated(libraries)
+        try:
+            cursor = conn.cursor()
+            # One read transaction across every attached library
+            cursor.execute("BEGIN")
+            book_counts = dict(cursor.execute(count_sql, names).fetchall())
+            custom_columns: Dict[str, Dict[str, str]] = {name: {} for name in names}
+            for name, label, column_name in cursor.execute(columns_sql, names):
+                custom_columns[name][label] = column_name
+        finally:
+            conn.close()
+        
+        return {name: _make_library_info(book_counts[name], custom_columns[name]) for name in names}
     
     def get_library_by_name(self, name: str) -> Optional[CalibreLibrary]:
-        """Get library by name."""
-        for library in self.libraries:
-            if library.name.lower() == name.lower():
-                return library
-        return None
+        """Get library by name (case-insensitive)."""
+        return self._by_lower_name.get(name.lower())
     
     def get_primary_library(self) -> Optional[CalibreLibrary]:
         """Get the primary library (MCR library)."""
@@ -149,32 +307,55 @@ class LibraryManager:
         )
         
         self.libraries.append(library)
+        self._by_lower_name.setdefault(library.lower_name, library)
         self.logger.info(f"Added library: {name} at {path}")
         return True
     
     def get_library_info(self, library: CalibreLibrary) -> Dict:
         """Get basic information about a library."""
         try:
-            conn = sqlite3.connect(library.metadata_db_path)
-            cursor = conn.cursor()
-            
-            # Get book count
-            cursor.execute("SELECT COUNT(*) FROM books")
-            book_count = cursor.fetchone()[0]
+            return self._read_library_info(library.metadata_db_path)
             
-            # Get custom columns
-            cursor.execute("SELECT label, name FROM custom_columns")
-            custom_columns = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            conn.close()
+        except (sqlite3.Error, OSError) as e:
+            self.logger.error(f"Error reading library info: {e}")
+            return {}
+    
+    def get_libraries_info(self, libraries: List[CalibreLibrary]) -> Dict[str, Dict]:
+        """
+        Get basic information about several libraries, keyed by library name.
+        
+        Libraries not already cached are read together through open_federated();
+        if a batch fails, its libraries are read one at a time instead.
+        """
+        results: Dict[str, Dict] = {}
+        stale: List[Tuple[CalibreLibrary, Tuple[str, int]]] = []
+        
+        for library in libraries:
+            try:
+                cache_key = self._info_cache_key(library.metadata_db_path)
+            except OSError:
+                # Let get_library_info log the problem
+                results[library.name] = self.get_library_info(library)
+                continue
             
-            return {
-                'book_count': book_count,
-                'custom_columns': custom_columns,
-                'has_my_ratings': 'myratings' in custom_columns or '#my_ratings' in custom_columns,
-                'has_my_genres': 'my_genres' in custom_columns or '#my_genres' in custom_columns
-            }
+            if cache_key in self._info_cache:
+                results[library.name] = self._info_cache[cache_key]
+            else:
+                stale.append((library, cache_key))
+        
+        for start in range(0, len(stale), _MAX_ATTACHED):
+            batch = stale[start:start + _MAX_ATTACHED]
+            try:
+                infos = self._read_federated_info([library for library, _ in batch])
+            except sqlite3.Error as e:
+                self.logger.warning(f"Federated library read failed, reading libraries individually: {e}")
+                for library, _ in batch:
+                    results[library.name] = self.get_library_info(library)
+                continue
             
-        except sqlite3.Error as e:
-            self.logger.error(f"Error reading library info: {e}")
-            return {}
\ No newline at end of file
+            for library, cache_key in batch:
+                info = infos[library.name]
+                self._info_cache[cache_key] = info
+                results[library.name] = info
+        
+        return results
\ No newline at end of file
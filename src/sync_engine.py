@@ -3,7 +3,9 @@ Sync Engine - Main orchestration for multi-library sync operations
 """
 
 import logging
-from typing import List, Dict, Optional
+from collections import Counter
+from dataclasses import asdict
+from typing import Callable, Iterator, List, Dict, Optional
 from pathlib import Path
 
 from config_manager import ConfigManager
@@ -29,10 +31,13 @@ class SyncEngine:
         
         # Data storage
         self.kobo_books: List[KoboBook] = []
+        self.kobo_books_by_id: Dict[str, KoboBook] = {}
         self.libraries: List[CalibreLibrary] = []
         self.matches: List[BookMatch] = []
         self.unmatched_books: List[KoboBook] = []
         self.conflicts: List = []
+        # Dry-run stats for the current matches; cleared whenever the matches change
+        self._last_simulation: Optional[Dict] = None
     
     def discover_libraries(self) -> List[CalibreLibrary]:
         """Discover Calibre libraries using configured search paths."""
@@ -44,15 +49,13 @@ class SyncEngine:
         if not self.libraries:
             raise Exception("No Calibre libraries found in search paths")
         
-        # Update configuration with discovered libraries
+        # Update configuration with discovered libraries; book counts and custom
+        # columns are read later, only for libraries that get updated
         library_info = {}
         for lib in self.libraries:
-            info = self.library_manager.get_library_info(lib)
             library_info[lib.name] = {
                 'path': str(lib.path),
-                'is_primary': lib.is_primary,
-                'book_count': info.get('book_count', 0),
-                'custom_columns': info.get('custom_columns', {})
+                'is_primary': lib.is_primary
             }
         
         self.config_manager.update_discovered_libraries(library_info)
@@ -74,6 +77,7 @@ class SyncEngine:
         
         # Get all books with collections
         self.kobo_books = self.kobo_reader.get_books_with_collections()
+        self.kobo_books_by_id = self.kobo_reader.books_by_id
         
         if not self.kobo_books:
             raise Exception("No books found in Kobo database")
@@ -81,38 +85,58 @@ class SyncEngine:
         self.logger.info(f"Loaded {len(self.kobo_books)} books from Kobo")
         
         # Log collection statistics
-        all_collections = set()
-        rating_collections = set()
-        for book in self.kobo_books:
-            all_collections.update(book.collections)
-            rating_collections.update(
-                col for col in book.collections 
-                if col in self.kobo_reader.rating_collections
-            )
-        
-        self.logger.info(f"Found {len(all_collections)} unique collections")
-        self.logger.info(f"Rating collections: {rating_collections}")
+        collection_stats = self.kobo_reader.get_collection_stats()
+        
+        self.logger.info(f"Found {collection_stats['unique']} unique collections")
+        self.logger.info(f"Rating collections: {collection_stats['rating_used']}")
         
         return self.kobo_books
     
-    def match_books(self) -> tuple[List[BookMatch], List[KoboBook], List]:
-        """Match Kobo books with Calibre libraries."""
-        self.logger.info("Starting book matching")
-        
+    def _prepare_matcher(self) -> BookMatcher:
+        """Check matching can run and return the book matcher, creating it on first use."""
         if not self.kobo_books:
             raise Exception("No Kobo books loaded. Call load_kobo_data() first.")
         
         if not self.libraries:
             raise Exception("No libraries discovered. Call discover_libraries() first.")
         
-        self.book_matcher = BookMatcher(self.library_manager)
-        self.matches, self.unmatched_books, self.conflicts = self.book_matcher.match_all_books(self.kobo_books)
+        self.library_manager.strict_primary_only = self.config_manager.is_strict_primary_only_enabled()
+        # Kept across runs so repeated previews reuse its library indexes
+        if self.book_matcher is None:
+            self.book_matcher = BookMatcher(self.library_manager)
+        return self.book_matcher
+    
+    def iter_matches(self) -> Iterator[BookMatch]:
+        """
+        Yield Kobo books matched to exactly one library, as they are found.
+        
+        Matching stops when the caller stops iterating, so taking the first
+        few matches doesn't match the whole Kobo library. Unlike match_books(),
+        the results are not stored on the engine.
+        """
+        book_matcher = self._prepare_matcher()
+        events = book_matcher.iter_matches(self.kobo_books)
+        try:
+            for event, payload in events:
+                if event == 'match':
+                    yield payload
+        finally:
+            events.close()
+            book_matcher.close()
+    
+    def match_books(self) -> tuple[List[BookMatch], List[KoboBook], List]:
+        """Match Kobo books with Calibre libraries."""
+        self.logger.info("Starting book matching")
+        
+        self._prepare_matcher()
+        try:
+            self.matches, self.unmatched_books, self.conflicts = self.book_matcher.match_all_books(self.kobo_books)
+        finally:
+            self.book_matcher.close()
+        self._last_simulation = None
         
         # Log matching statistics
-        match_stats = {}
-        for match in self.matches:
-            lib_name = match.library.name
-            match_stats[lib_name] = match_stats.get(lib_name, 0) + 1
+        match_stats = Counter(match.library.name for match in self.matches)
         
         self.logger.info(f"Matching complete:")
         self.logger.info(f"  Matched: {len(self.matches)} books")
@@ -123,8 +147,32 @@ class SyncEngine:
         
         return self.matches, self.unmatched_books, self.conflicts
     
+    def _record_library_info(self, libraries: List[CalibreLibrary]) -> None:
+        """Read book count and custom columns for the given libraries into the config."""
+        if not libraries:
+            return
+        
+        # Read together over one connection with every library attached
+        infos = self.library_manager.get_libraries_info(libraries)
+        
+        self.config_manager.update_discovered_library_info({
+            name: {
+                'book_count': info.get('book_count', 0),
+                'custom_columns': info.get('custom_columns', {})
+            }
+            for name, info in infos.items()
+        })
+    
     def update_calibre_metadata(self, dry_run: bool = True) -> Dict:
         """Update Calibre metadata for matched books."""
+        if dry_run and self._last_simulation is not None:
+            # Nothing has changed since the last preview (e.g. run_sync's own dry run)
+            self.logger.info("Reusing dry run results for the current matches")
+            return {**self._last_simulation, 'libraries_updated': set(self._last_simulation['libraries_updated'])}
+        
+        # Library details are only worth reading for the libraries being updated
+        self._record_library_info(list({id(m.library): m.library for m in self.matches}.values()))
+        
         if dry_run:
             self.logger.info("="*60)
             self.logger.info("RUNNING IN DRY RUN MODE")
@@ -132,7 +180,9 @@ class SyncEngine:
             self.logger.info("No calibredb commands will be executed")
             self.logger.info("This is a preview only")
             self.logger.info("="*60)
-            return self._simulate_updates()
+            stats = self._simulate_updates()
+            self._last_simulation = {**stats, 'libraries_updated': set(stats['libraries_updated'])}
+            return stats
         
         self.logger.info("Starting Calibre metadata updates")
         
@@ -143,12 +193,13 @@ class SyncEngine:
         stats = self.calibre_updater.bulk_update(self.matches)
         
         self.logger.info(f"Metadata update complete:")
-        self.logger.info(f"  Total books: {stats['total']}")
-        self.logger.info(f"  Successful: {stats['successful']}")
-        self.logger.info(f"  Failed: {stats['failed']}")
-        self.logger.info(f"  Libraries updated: {list(stats['libraries_updated'])}")
+        self.logger.info(f"  Total books: {stats.total}")
+        self.logger.info(f"  Successful: {stats.successful}")
+        self.logger.info(f"  Failed: {stats.failed}")
+        self.logger.info(f"  Libraries updated: {list(stats.libraries_updated)}")
         
-        return stats
+        # Results are merged into the run_sync dict, same shape as the dry-run stats
+        return asdict(stats)
     
     def _simulate_updates(self) -> Dict:
         """Simulate updates for dry run mode."""
@@ -173,10 +224,9 @@ class SyncEngine:
         for lib_name, lib_matches in by_library.items():
             self.logger.info(f"Would update {len(lib_matches)} books in {lib_name}:")
             for match in lib_matches[:5]:  # Show first 5 examples
-                rating_cols = [col for col in match.kobo_book.collections 
-                              if col in self.kobo_reader.rating_collections]
-                genre_cols = [col for col in match.kobo_book.collections 
-                             if col not in self.kobo_reader.rating_collections]
+                # Split when the book was read from Kobo
+                rating_cols = match.kobo_book.rating_collections
+                genre_cols = match.kobo_book.genre_collections
                 
                 self.logger.info(f"  '{match.kobo_book.title}' by {match.kobo_book.author}")
                 if rating_cols:
@@ -221,22 +271,36 @@ class SyncEngine:
         """Apply resolved matches from conflict resolution."""
         if resolved_matches:
             self.matches.extend(resolved_matches)
+            self._last_simulation = None
             self.logger.info(f"Applied {len(resolved_matches)} resolved matches from conflicts")
     
-    def run_sync(self, dry_run: bool = True) -> Dict:
-        """Run complete sync process."""
+    def run_sync(self, dry_run: bool = True, progress_callback: Optional[Callable[[int], None]] = None) -> Dict:
+        """
+        Run complete sync process.
+        
+        Args:
+            dry_run: Preview the updates without touching Calibre
+            progress_callback: Called with the overall percentage (0-100) as each step finishes
+        """
         self.logger.info(f"Starting full sync process (dry_run={dry_run})")
         
+        def report_progress(percent: int):
+            if progress_callback:
+                progress_callback(percent)
+        
         try:
             # Step 1: Ensure libraries are discovered
             if not self.libraries:
                 self.discover_libraries()
+            report_progress(10)
             
             # Step 2: Load Kobo data
             self.load_kobo_data()
+            report_progress(25)
             
             # Step 3: Match books
             self.match_books()
+            report_progress(60)
             
             # Step 4: Handle conflicts
             if self.conflicts:
@@ -245,9 +309,11 @@ class SyncEngine:
             
             # Step 5: Update metadata
             update_stats = self.update_calibre_metadata(dry_run=dry_run)
+            report_progress(90)
             
             # Step 6: Generate reports
             reports = self.generate_reports()
+            report_progress(100)
             
             # Combine results
             results = {
@@ -264,4 +330,7 @@ class SyncEngine:
             
         except Exception as e:
             self.logger.error(f"Sync process failed: {e}")
-            raise
\ No newline at end of file
+            raise
+        finally:
+            if self.kobo_reader:
+                self.kobo_reader.close()
\ No newline at end of file
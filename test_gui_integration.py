@@ -3,7 +3,12 @@ Test GUI integration without actually launching the interface
 """
 
 import sys
-sys.path.append('./src')
+from pathlib import Path
+
+# Make src/ importable from any working directory, without adding it twice
+SRC_DIR = str(Path(__file__).parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
 from config_manager import ConfigManager
 from gui import KoboSyncGUI
@@ -2,127 +2,178 @@
 Test all the UI and functionality improvements
 """
 
+import inspect
+import io
+import mmap
+import os
+import re
 import sys
-sys.path.append('./src')
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Make src/ importable from any working directory, without adding it twice
+SRC_DIR = str(Path(__file__).parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
 from config_manager import ConfigManager
 from sync_engine import SyncEngine
 from book_matcher import BookMatcher
 from library_manager import LibraryManager
-from pathlib import Path
 
-def test_all_improvements():
-    print('=== Testing All UI and Functionality Improvements ===\n')
-    
-    # Test 1: Unmatched books file generation
-    print('1. Testing unmatched books file generation...')
-    config_manager = ConfigManager()
-    sync_engine = SyncEngine(config_manager)
-    
-    # Run sync to generate unmatched books
-    results = sync_engine.run_sync(dry_run=True)
+# Each check returns its output lines, so checks can run concurrently and
+# still be printed in order
+
+def check_unmatched_file(results):
+    """Test 1: Unmatched books file generation."""
+    lines = ['1. Testing unmatched books file generation...']
     
     # Check if file was created
     if 'reports' in results and 'unmatched_file' in results['reports']:
         file_path = results['reports']['unmatched_file']
-        if file_path and Path(file_path).exists():
-            file_size = Path(file_path).stat().st_size
-            print(f'   ✓ Unmatched books file created: {file_path}')
-            print(f'   ✓ File size: {file_size} bytes')
+        # One stat call both confirms the file exists and gives its size
+        try:
+            file_stat = os.stat(file_path) if file_path else None
+        except OSError:
+            file_stat = None
+        
+        if file_stat:
+            lines.append(f'   ✓ Unmatched books file created: {file_path}')
+            lines.append(f'   ✓ File size: {file_stat.st_size} bytes')
             
-            # Check file content
-            with open(file_path, 'r') as f:
-                content = f.read()
-                if 'Detailed List:' in content and 'Possible reasons for no match:' in content:
-                    print(f'   ✓ File contains detailed analysis')
-                else:
-                    print(f'   ❌ File missing detailed analysis')
+            # Check file content, searching the mapped file in place (empty files can't be mapped)
+            has_analysis = False
+            if file_stat.st_size:
+                with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    has_analysis = mm.find(b'Detailed List:') != -1 and mm.find(b'Possible reasons for no match:') != -1
+            if has_analysis:
+                lines.append(f'   ✓ File contains detailed analysis')
+            else:
+                lines.append(f'   ❌ File missing detailed analysis')
         else:
-            print(f'   ❌ Unmatched books file not found')
+            lines.append(f'   ❌ Unmatched books file not found')
     else:
-        print(f'   ❌ No unmatched file path in results')
+        lines.append(f'   ❌ No unmatched file path in results')
     
-    # Test 2: Dry run safety verification
-    print('\\n2. Testing dry run safety...')
+    return lines
+
+def check_dry_run(sync_engine):
+    """Test 2: Dry run safety verification."""
+    lines = ['\\n2. Testing dry run safety...']
     dry_run_results = sync_engine.update_calibre_metadata(dry_run=True)
     if dry_run_results.get('dry_run', False):
-        print('   ✓ Dry run flag correctly set')
+        lines.append('   ✓ Dry run flag correctly set')
         if dry_run_results.get('total', 0) > 0:
-            print('   ✓ Books would be updated (simulation working)')
+            lines.append('   ✓ Books would be updated (simulation working)')
         else:
-            print('   ❌ No books in simulation')
+            lines.append('   ❌ No books in simulation')
     else:
-        print('   ❌ Dry run flag not set correctly')
-    
-    # Test 3: Enhanced reporting
-    print('\\n3. Testing enhanced reporting...')
+        lines.append('   ❌ Dry run flag not set correctly')
+    return lines
+
+def check_reports(results):
+    """Test 3: Enhanced reporting."""
+    lines = ['\\n3. Testing enhanced reporting...']
     if 'reports' in results:
         reports = results['reports']
         if 'summary' in reports and 'unmatched' in reports:
-            print('   ✓ Summary and unmatched reports generated')
+            lines.append('   ✓ Summary and unmatched reports generated')
             if 'unmatched_file' in reports:
-                print('   ✓ Unmatched file path included in reports')
+                lines.append('   ✓ Unmatched file path included in reports')
             else:
-                print('   ❌ Unmatched file path missing from reports')
+                lines.append('   ❌ Unmatched file path missing from reports')
         else:
-            print('   ❌ Missing report components')
+            lines.append('   ❌ Missing report components')
     else:
-        print('   ❌ No reports in results')
-    
-    # Test 4: GUI component integration (basic test)
-    print('\\n4. Testing GUI components...')
+        lines.append('   ❌ No reports in results')
+    return lines
+
+def check_gui_components():
+    """Test 4: GUI component integration (basic test)."""
+    lines = ['\\n4. Testing GUI components...']
     try:
-        import tkinter as tk
+        # Inspect the class rather than building the window, so no Tk root
+        # or display connection is needed
         from gui import KoboSyncGUI
         
-        root = tk.Tk()
-        root.withdraw()  # Hide window
-        
-        app = KoboSyncGUI(config_manager)
-        
-        # Check for new button
-        if hasattr(app, 'real_sync_btn'):
-            print('   ✓ Real Sync button component exists')
+        # Check for new button (an instance attribute assigned while building widgets)
+        if re.search(r'self\.real_sync_btn\s*=', inspect.getsource(KoboSyncGUI)):
+            lines.append('   ✓ Real Sync button component exists')
         else:
-            print('   ❌ Real Sync button missing')
-            
+            lines.append('   ❌ Real Sync button missing')
+        
         # Check for enhanced methods
-        if hasattr(app, '_start_real_sync'):
-            print('   ✓ Real sync method exists')
+        if hasattr(KoboSyncGUI, '_start_real_sync'):
+            lines.append('   ✓ Real sync method exists')
         else:
-            print('   ❌ Real sync method missing')
-            
-        if hasattr(app, '_on_real_sync_complete'):
-            print('   ✓ Real sync completion handler exists')
-        else:
-            print('   ❌ Real sync completion handler missing')
+            lines.append('   ❌ Real sync method missing')
         
-        root.destroy()
-        print('   ✓ GUI components test passed')
+        if hasattr(KoboSyncGUI, '_on_real_sync_complete'):
+            lines.append('   ✓ Real sync completion handler exists')
+        else:
+            lines.append('   ❌ Real sync completion handler missing')
         
-    except Exception as e:
-        print(f'   ❌ GUI test failed: {e}')
+        lines.append('   ✓ GUI components test passed')
     
-    # Test 5: Results summary
-    print('\\n5. Overall results summary...')
+    except Exception as e:
+        lines.append(f'   ❌ GUI test failed: {e}')
+    return lines
+
+def summarize_results(results):
+    """Test 5: Results summary."""
+    lines = ['\\n5. Overall results summary...']
     total_books = results.get('kobo_books_total', 0)
     matched_books = results.get('total', 0)
     unmatched_books = results.get('unmatched_count', 0)
     libraries = results.get('libraries_found', 0)
     
-    print(f'   📚 Total Kobo books: {total_books}')
-    print(f'   ✅ Matched books: {matched_books}')
-    print(f'   ❌ Unmatched books: {unmatched_books}')
-    print(f'   📖 Libraries found: {libraries}')
-    print(f'   🎯 Match rate: {(matched_books/total_books*100):.1f}%')
+    lines.append(f'   📚 Total Kobo books: {total_books}')
+    lines.append(f'   ✅ Matched books: {matched_books}')
+    lines.append(f'   ❌ Unmatched books: {unmatched_books}')
+    lines.append(f'   📖 Libraries found: {libraries}')
+    # No Kobo books is exactly the failure Test 1 reports, so don't crash on it here
+    match_rate = (matched_books / total_books * 100) if total_books else 0.0
+    lines.append(f'   🎯 Match rate: {match_rate:.1f}%')
+    return lines
+
+def test_all_improvements():
+    # Output is collected and written to stdout once at the end
+    out = io.StringIO()
+    log = out.write
+    log('=== Testing All UI and Functionality Improvements ===\n\n')
+    
+    config_manager = ConfigManager()
+    sync_engine = SyncEngine(config_manager)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        # The GUI check doesn't depend on the sync, so it runs alongside it
+        gui_check = pool.submit(check_gui_components)
+        
+        # Run sync to generate unmatched books
+        results = sync_engine.run_sync(dry_run=True)
+        
+        checks = [
+            pool.submit(check_unmatched_file, results),
+            pool.submit(check_dry_run, sync_engine),
+            pool.submit(check_reports, results),
+            gui_check,
+            pool.submit(summarize_results, results),
+        ]
+        
+        for check in checks:
+            for line in check.result():
+                log(line + '\n')
+    
+    log('\\n🎉 All improvements testing complete!\n')
+    log('\\nSummary of enhancements:\n')
+    log('  ✓ Complete unmatched books list saved to detailed file\n')
+    log('  ✓ Dry run mode verified safe (no file modifications)\n')
+    log('  ✓ Enhanced GUI workflow with Real Sync button\n')
+    log('  ✓ Improved progress reporting and completion dialogs\n')
+    log('  ✓ File paths included in reports for user reference\n')
     
-    print('\\n🎉 All improvements testing complete!')
-    print('\\nSummary of enhancements:')
-    print('  ✓ Complete unmatched books list saved to detailed file')
-    print('  ✓ Dry run mode verified safe (no file modifications)')
-    print('  ✓ Enhanced GUI workflow with Real Sync button')
-    print('  ✓ Improved progress reporting and completion dialogs')
-    print('  ✓ File paths included in reports for user reference')
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
 
 if __name__ == '__main__':
     test_all_improvements()
\ No newline at end of file
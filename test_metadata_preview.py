@@ -2,50 +2,68 @@
 Preview what metadata would be updated
 """
 
+import io
 import sys
-sys.path.append('./src')
+from itertools import islice
+from pathlib import Path
+
+# Make src/ importable from any working directory, without adding it twice
+SRC_DIR = str(Path(__file__).parent / 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
 from config_manager import ConfigManager
 from sync_engine import SyncEngine
 
+# One book's entry in the preview
+BOOK_TEMPLATE = (
+    '{i}. "{title}" by {author}\n'
+    '   Library: {library}\n'
+    '   Calibre Book ID: {book_id}\n'
+    '   My Ratings → {ratings}\n'
+    '   My Genres → {genres}\n'
+    '   Read Status: {read_status}, Progress: {percent_read}%\n'
+    '\n'
+)
+
 def preview_metadata_updates():
-    print('=== Preview of Metadata Updates ===')
+    # Output is collected and written to stdout once at the end
+    out = io.StringIO()
+    log = out.write
+    log('=== Preview of Metadata Updates ===\n')
     config_manager = ConfigManager()
     sync_engine = SyncEngine(config_manager)
     
     # Get all the components
     sync_engine.discover_libraries()
     sync_engine.load_kobo_data()
-    matches, unmatched = sync_engine.match_books()
     
-    print(f'Found {len(matches)} books to update\n')
+    # Show sample of what would be updated; matching stops after the first 10
+    sample_matches = list(islice(sync_engine.iter_matches(), 10))
     
-    # Show sample of what would be updated
-    sample_matches = matches[:10]  # First 10 matches
+    log(f'Found at least {len(sample_matches)} books to update\n\n')
     
     for i, match in enumerate(sample_matches, 1):
         book = match.kobo_book
-        rating_cols = [col for col in book.collections if col in sync_engine.kobo_reader.rating_collections]
-        genre_cols = [col for col in book.collections if col not in sync_engine.kobo_reader.rating_collections]
+        # Split into rating and genre display names once, when the book was read
+        rating_cols = book.rating_collections
+        genre_cols = book.genre_collections
         
-        print(f'{i}. "{book.title}" by {book.author}')
-        print(f'   Library: {match.library.name}')
-        print(f'   Calibre Book ID: {match.calibre_book_id}')
-        
-        if rating_cols:
-            # Convert to display values
-            rating_display = [sync_engine.kobo_reader.rating_collections[col] for col in rating_cols]
-            print(f'   My Ratings → {", ".join(rating_display)}')
-        else:
-            print(f'   My Ratings → (no rating collections)')
-            
-        if genre_cols:
-            print(f'   My Genres → {", ".join(genre_cols)}')
-        else:
-            print(f'   My Genres → (no genre collections)')
-            
-        print(f'   Read Status: {book.read_status}, Progress: {book.percent_read}%')
-        print()
+        log(BOOK_TEMPLATE.format(
+            i=i,
+            title=book.title,
+            author=book.author,
+            library=match.library.name,
+            book_id=match.calibre_book_id,
+            # Collections already hold the rating display values
+            ratings=', '.join(rating_cols) if rating_cols else '(no rating collections)',
+            genres=', '.join(genre_cols) if genre_cols else '(no genre collections)',
+            read_status=book.read_status,
+            percent_read=book.percent_read
+        ))
+    
+    sys.stdout.write(out.getvalue())
+    sys.stdout.flush()
 
 if __name__ == '__main__':
     preview_metadata_updates()
\ No newline at end of file